@@ -0,0 +1,130 @@
+import json
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
+
+from config import CONTEXT_TOKEN_BUDGET
+
+_MAX_TOOL_PREVIEW = 300
+_MAX_TURN_PREVIEW = 160
+_MAX_SUMMARY_ROWS = 10
+_MAX_SUMMARY_LINES = 30
+# Validated passenger details the checkout tools are called with, kept verbatim
+_PASSENGER_TOOLS = {
+    "collect_passenger_details": "Latest validated passenger",
+    "collect_group_details": "Latest validated group",
+}
+
+
+def estimate_tokens(messages) -> int:
+    """Rough token count (~4 chars per token plus per-message overhead)."""
+    total = 0
+    for m in messages:
+        content = m.content if isinstance(m.content, str) else json.dumps(m.content, default=str)
+        total += len(content) // 4 + 4
+        for tc in getattr(m, "tool_calls", None) or []:
+            total += len(json.dumps(tc.get("args", {}), default=str)) // 4 + 4
+    return total
+
+
+def _ticket_line(t: dict) -> str:
+    name = t.get("airline") or t.get("operator") or t.get("title") or ""
+    when = t.get("departure") or t.get("showtime") or ""
+    route = t.get("origin", "")
+    if t.get("destination"):
+        route += f"->{t['destination']}"
+    extra = t.get("class") or t.get("theater") or ""
+    return " ".join(str(p) for p in (t.get("id"), name, route, t.get("date"), when, extra, f"₹{t.get('price')}") if p)
+
+
+def summarize_tool_result(content: str) -> str:
+    """Collapse a verbose tool result (e.g. a ticket list) into a compact summary."""
+    if len(content) <= _MAX_TOOL_PREVIEW:
+        return content
+    body = content.partition("\n\n(Note")[0]
+    try:
+        data = json.loads(body)
+    except ValueError:
+        lines = body.split("\n")
+        if "|" in lines[0]:
+            # Compact ticket table: keep the header and the first rows
+            rows = [line for line in lines[1:] if "|" in line]
+            kept = [lines[0]] + rows[:_MAX_SUMMARY_ROWS]
+            if len(rows) > _MAX_SUMMARY_ROWS:
+                kept.append(f"(+{len(rows) - _MAX_SUMMARY_ROWS} more rows)")
+            return "\n".join(kept)
+        return content[:_MAX_TOOL_PREVIEW] + " …[truncated]"
+    if isinstance(data, list) and all(isinstance(t, dict) for t in data):
+        lines = [_ticket_line(t) for t in data[:_MAX_SUMMARY_ROWS]]
+        if len(data) > _MAX_SUMMARY_ROWS:
+            lines.append(f"+{len(data) - _MAX_SUMMARY_ROWS} more")
+        return f"[{len(data)} results, summarized] " + "; ".join(lines)
+    return json.dumps(data, separators=(",", ":"), default=str)[:_MAX_TOOL_PREVIEW]
+
+
+def _split_turns(messages):
+    """Split messages into turns, each starting at a HumanMessage."""
+    turns = []
+    for m in messages:
+        if isinstance(m, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(m)
+    return turns
+
+
+def _summarize_turns(turns) -> str:
+    lines = []
+    for turn in turns:
+        for m in turn:
+            if isinstance(m, HumanMessage):
+                lines.append(f"- User: {str(m.content)[:_MAX_TURN_PREVIEW]}")
+            elif isinstance(m, ToolMessage):
+                lines.append(f"- Tool {m.name or 'result'}: {str(m.content)[:_MAX_TURN_PREVIEW]}")
+            elif m.content:
+                lines.append(f"- Assistant: {str(m.content)[:_MAX_TURN_PREVIEW]}")
+    if len(lines) > _MAX_SUMMARY_LINES:
+        omitted = len(lines) - _MAX_SUMMARY_LINES
+        lines = [f"- ({omitted} earlier lines omitted)"] + lines[-_MAX_SUMMARY_LINES:]
+    return "\n".join(lines)
+
+
+def build_llm_context(messages, system_prompt: str, budget: int = CONTEXT_TOKEN_BUDGET) -> list:
+    """Return the message list to send to the LLM, kept within a token budget.
+
+    Tool results from earlier turns are replaced by compact summaries; the
+    current turn and the latest passenger or group validation stay verbatim. If the
+    history is still over budget, the oldest turns are folded into a short
+    summary appended to the system prompt. State is never modified.
+    """
+    convo = [m for m in messages if not isinstance(m, SystemMessage)]
+
+    last_human = max((i for i, m in enumerate(convo) if isinstance(m, HumanMessage)), default=0)
+    latest_passenger = None
+    for m in convo:
+        if isinstance(m, ToolMessage) and m.name in _PASSENGER_TOOLS:
+            latest_passenger = m
+
+    compacted = []
+    for i, m in enumerate(convo):
+        if i < last_human and isinstance(m, ToolMessage) and m is not latest_passenger:
+            m = m.model_copy(update={"content": summarize_tool_result(str(m.content))})
+        compacted.append(m)
+
+    system = SystemMessage(content=system_prompt)
+    if estimate_tokens([system] + compacted) <= budget:
+        return [system] + compacted
+
+    # Drop the oldest turns (whole turns, so tool calls stay paired with results)
+    turns = _split_turns(compacted)
+    kept = [turns.pop()]
+    used = estimate_tokens([system] + kept[0])
+    while turns:
+        cost = estimate_tokens(turns[-1])
+        if used + cost > budget * 3 // 4:
+            break
+        used += cost
+        kept.insert(0, turns.pop())
+
+    summary = _summarize_turns(turns)
+    if latest_passenger is not None and not any(latest_passenger in t for t in kept):
+        summary += f"\n- {_PASSENGER_TOOLS[latest_passenger.name]}: {latest_passenger.content}"
+    system = SystemMessage(content=f"{system_prompt}\n\nEARLIER IN THIS CONVERSATION (summarized):\n{summary}")
+    return [system] + [m for turn in kept for m in turn]
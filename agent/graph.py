@@ -1,9 +1,22 @@
+import asyncio
 import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
 from langchain_groq import ChatGroq
-from langchain_core.messages import SystemMessage, ToolMessage
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 from agent.state import AgentState
+from agent.context import build_llm_context
+from agent.router import route_message
+from agent.llm_cache import SIDE_EFFECT_TOOLS, LLMResponseCache
 from tools import all_tools
+from monitoring.metrics import LLM_SECONDS, NODE_SECONDS, TOOL_SECONDS, record_llm_usage
+from config import FAST_PATH_ROUTER, IO_WORKERS, LLM_CACHE_ENABLED, TOOL_TIMEOUT
+
+# Bounded pool for blocking tool work (sqlite, SMTP) on the async path
+_io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="omnibook-io")
 
 
 SYSTEM_PROMPT = """You are OmniBook AI, an autonomous ticket booking agent. You help users book flights, trains, and movie tickets.
@@ -16,13 +29,16 @@ UNDERSTANDING USER INPUT:
 - Examples of DATE (use search_tickets with date): "March 5", "2026-03-05", "5th March", "on March 5th", "tomorrow"
 - A valid date MUST contain a month name or be in YYYY-MM-DD format. A plain number like 1500 is NEVER a date.
 - If user does not mention a specific date, do NOT pass any date — search without date filter.
+- Date phrases ("today", "tomorrow", "this weekend", "next week") can be passed as date directly; for a span of days pass date and end_date.
+- Departure times ("morning flights", "after 6pm"), class/genre, seats needed and sorting (cheapest, earliest, shortest) are search filters, not separate steps.
 
 STEP 1 - SEARCH: When the user asks to book, use search_tickets to find options.
    If they mention a budget/price, use filter_by_budget instead.
    Then STOP — show the results to the user and ask them to pick one.
    WAIT for user response.
 
-STEP 2 - SELECTION: After the user picks a ticket, confirm their selection with the ticket details and price.
+STEP 2 - SELECTION: After the user picks a ticket, call hold_ticket to reserve the seat, then confirm their selection with the ticket details, price and how long the seat is held.
+   If the ticket is sold out, say so and offer the other options. If they change their pick, pass the old hold_id as previous_hold_id.
    Then STOP — ask the user for their passenger details (name, age, email, phone) if not already provided.
    WAIT for user response.
 
@@ -30,15 +46,16 @@ STEP 3 - VALIDATE: Once the user provides passenger details, use collect_passeng
    Then STOP — show a booking summary (ticket + passenger + total price) and ask "Shall I proceed with payment?"
    WAIT for user response.
 
-STEP 4 - PAYMENT & BOOKING: ONLY after the user explicitly confirms payment (says yes/confirm/proceed), do ALL of these in sequence:
-   a) process_payment_mock
-   b) save_booking_to_db
-   c) generate_receipt
-   d) send_email_confirmation
-   Then show the receipt to the user.
+STEP 4 - PAYMENT & BOOKING: ONLY after the user explicitly confirms payment (says yes/confirm/proceed), call checkout ONCE with the ticket_id, the validated passenger details and the hold_id from hold_ticket.
+   It takes payment, saves the booking, builds the receipt and emails it. Then show the receipt to the user.
+
+GROUP BOOKINGS: When several people travel together on the same ticket, follow the same steps once for the whole group:
+   hold_ticket with seats = number of passengers, collect_group_details with every passenger in one call,
+   then group_checkout ONCE with all of them. Never book group members one at a time.
 
 RULES:
-- NEVER call process_payment_mock, save_booking_to_db, generate_receipt, or send_email_confirmation without explicit user confirmation
+- NEVER call hold_ticket before the user has picked a specific ticket
+- NEVER call checkout or group_checkout without explicit user confirmation
 - NEVER skip showing options and asking the user to choose
 - NEVER bundle multiple steps — always STOP and WAIT after steps 1, 2, and 3
 - If the user provides all info at once, you still must show the summary and ask for payment confirmation before proceeding
@@ -46,25 +63,62 @@ RULES:
 - Be helpful, concise, and guide the user through the booking process"""
 
 
-def build_graph(api_key: str, model_name: str = "llama-3.3-70b-versatile"):
-    """Build and compile the LangGraph booking agent."""
+def _timed_node(name, func):
+    """Wrap a node function (sync or async) so its wall time is recorded per node."""
+    if asyncio.iscoroutinefunction(func):
+        async def timed_async(state):
+            with NODE_SECONDS.time(node=name):
+                return await func(state)
+        return timed_async
+
+    def timed(state):
+        with NODE_SECONDS.time(node=name):
+            return func(state)
+    return timed
+
+
+def build_graph(api_key: str, model_name: str = "llama-3.3-70b-versatile", llm_cache: LLMResponseCache | None = None):
+    """Build and compile the LangGraph booking agent.
+
+    Pass `llm_cache` to share a response cache (e.g. to read its stats);
+    otherwise one is created when LLM_CACHE_ENABLED is set.
+    """
 
     llm = ChatGroq(model=model_name, temperature=0, api_key=api_key)
     llm_with_tools = llm.bind_tools(all_tools)
     tool_map = {t.name: t for t in all_tools}
+    if llm_cache is None and LLM_CACHE_ENABLED:
+        llm_cache = LLMResponseCache(all_tools, model_name)
 
-    def agent_node(state: AgentState) -> dict:
-        """LLM agent node — decides next action or responds to user."""
-        messages = list(state["messages"])
+    def router_node(state: AgentState) -> dict:
+        """Fast path — turn a clear search request into a direct tool call, skipping the LLM."""
+        last_msg = state["messages"][-1]
+        if not FAST_PATH_ROUTER or not isinstance(last_msg, HumanMessage):
+            return {"steps": []}
+
+        call = route_message(str(last_msg.content))
+        if call is None:
+            return {"steps": []}
 
-        # Inject system prompt if not present
-        if not any(isinstance(m, SystemMessage) for m in messages):
-            messages = [SystemMessage(content=SYSTEM_PROMPT)] + messages
+        tool_call = {
+            "name": call["name"],
+            "args": call["args"],
+            "id": f"route_{uuid.uuid4().hex[:12]}",
+            "type": "tool_call",
+        }
+        args_preview = json.dumps(call["args"], default=str)[:150]
+        return {
+            "messages": [AIMessage(content="", tool_calls=[tool_call])],
+            "steps": [f"Router: {call['name']}({args_preview})"],
+        }
 
-        response = llm_with_tools.invoke(messages)
+    def _prepare_messages(state: AgentState) -> list:
+        # System prompt + history compacted to the context token budget
+        return build_llm_context(state["messages"], SYSTEM_PROMPT)
 
+    def _agent_update(response, cached: bool = False) -> dict:
         # Track reasoning steps
-        new_steps = []
+        new_steps = ["Agent: (cached response)"] if cached else []
         if response.content:
             new_steps.append(f"Agent: {response.content[:300]}")
         if hasattr(response, "tool_calls") and response.tool_calls:
@@ -72,34 +126,108 @@ def build_graph(api_key: str, model_name: str = "llama-3.3-70b-versatile"):
                 args_preview = json.dumps(tc["args"], default=str)[:150]
                 new_steps.append(f"Calling: {tc['name']}({args_preview})")
 
-        return {"messages": [response], "steps": new_steps}
+        return {"messages": [response], "steps": new_steps, "llm_cached": cached}
 
-    def tool_node(state: AgentState) -> dict:
-        """Execute the tool calls requested by the agent."""
-        last_msg = state["messages"][-1]
-        tool_messages = []
-        new_steps = []
+    def agent_node(state: AgentState) -> dict:
+        """LLM agent node — decides next action or responds to user."""
+        messages = _prepare_messages(state)
+        cached = llm_cache.get(messages) if llm_cache else None
+        if cached is not None:
+            LLM_SECONDS.observe(0.0, cached="true")
+            return _agent_update(cached, cached=True)
 
-        for tool_call in last_msg.tool_calls:
-            name = tool_call["name"]
-            args = tool_call["args"]
+        with LLM_SECONDS.time(cached="false"):
+            response = llm_with_tools.invoke(messages)
+        record_llm_usage(response)
+        if llm_cache:
+            llm_cache.put(messages, response)
+        return _agent_update(response)
+
+    async def agent_node_async(state: AgentState) -> dict:
+        """Async variant of agent_node used by ainvoke/astream."""
+        messages = _prepare_messages(state)
+        loop = asyncio.get_running_loop()
+        # The cache reads, writes and prunes SQLite, so it runs on the I/O executor
+        cached = await loop.run_in_executor(_io_executor, llm_cache.get, messages) if llm_cache else None
+        if cached is not None:
+            LLM_SECONDS.observe(0.0, cached="true")
+            return _agent_update(cached, cached=True)
+
+        with LLM_SECONDS.time(cached="false"):
+            response = await llm_with_tools.ainvoke(messages)
+        record_llm_usage(response)
+        if llm_cache:
+            await loop.run_in_executor(_io_executor, llm_cache.put, messages, response)
+        return _agent_update(response)
 
-            if name in tool_map:
-                try:
-                    result = tool_map[name].invoke(args)
-                    result_str = str(result)
-                except Exception as e:
-                    result_str = f"Error running {name}: {str(e)}"
-            else:
-                result_str = f"Tool '{name}' not found"
+    def _run_tool(tool_call) -> tuple[str, float]:
+        """Run one tool call, returning its result text and latency in seconds."""
+        name = tool_call["name"]
+        if name not in tool_map:
+            return f"Tool '{name}' not found", 0.0
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            result_str = str(tool_map[name].invoke(tool_call["args"]))
+        except Exception as e:
+            result_str = f"Error running {name}: {str(e)}"
+            outcome = "error"
+        elapsed = time.perf_counter() - started
+        TOOL_SECONDS.observe(elapsed, tool=name, outcome=outcome)
+        return result_str, elapsed
 
+    def _timed_out(tool_call) -> tuple[str, float]:
+        # The tool keeps running on its worker and records its own latency when it ends
+        TOOL_SECONDS.observe(TOOL_TIMEOUT, tool=tool_call["name"], outcome="timeout")
+        return f"Error running {tool_call['name']}: timed out after {TOOL_TIMEOUT:g}s", TOOL_TIMEOUT
+
+    def _tool_update(tool_calls, results) -> dict:
+        tool_messages = []
+        new_steps = []
+        for tool_call, (result_str, elapsed) in zip(tool_calls, results):
+            name = tool_call["name"]
             tool_messages.append(
-                ToolMessage(content=result_str, tool_call_id=tool_call["id"])
+                ToolMessage(content=result_str, tool_call_id=tool_call["id"], name=name)
             )
-            new_steps.append(f"Result [{name}]: {result_str[:200]}")
+            new_steps.append(f"Result [{name}] ({elapsed * 1000:.0f} ms): {result_str[:200]}")
 
         return {"messages": tool_messages, "steps": new_steps}
 
+    def tool_node(state: AgentState) -> dict:
+        """Execute the tool calls requested by the agent, concurrently and in call order."""
+        tool_calls = state["messages"][-1].tool_calls
+        deadline = time.monotonic() + TOOL_TIMEOUT
+        futures = [_io_executor.submit(_run_tool, tc) for tc in tool_calls]
+        results = []
+        for tc, future in zip(tool_calls, futures):
+            # A side-effecting tool (hold, payment, email) is awaited to the end: if it were
+            # reported as timed out while its worker commits, the LLM could retry and book twice
+            if tc["name"] in SIDE_EFFECT_TOOLS:
+                results.append(future.result())
+                continue
+            try:
+                results.append(future.result(timeout=max(0.0, deadline - time.monotonic())))
+            except FuturesTimeout:
+                results.append(_timed_out(tc))
+        return _tool_update(tool_calls, results)
+
+    async def tool_node_async(state: AgentState) -> dict:
+        """Async variant of tool_node; blocking tools (sqlite, SMTP) run on the I/O executor."""
+        tool_calls = state["messages"][-1].tool_calls
+        loop = asyncio.get_running_loop()
+
+        async def run(tc):
+            call = loop.run_in_executor(_io_executor, _run_tool, tc)
+            if tc["name"] in SIDE_EFFECT_TOOLS:
+                return await call
+            try:
+                return await asyncio.wait_for(call, TOOL_TIMEOUT)
+            except asyncio.TimeoutError:
+                return _timed_out(tc)
+
+        results = await asyncio.gather(*(run(tc) for tc in tool_calls))
+        return _tool_update(tool_calls, results)
+
     def should_continue(state: AgentState) -> str:
         """Route to tools if agent requested tool calls, otherwise end."""
         last_msg = state["messages"][-1]
@@ -107,11 +235,24 @@ def build_graph(api_key: str, model_name: str = "llama-3.3-70b-versatile"):
             return "tools"
         return END
 
+    def after_router(state: AgentState) -> str:
+        """Run the routed tool call directly, or hand the message to the LLM."""
+        last_msg = state["messages"][-1]
+        if getattr(last_msg, "tool_calls", None):
+            return "tools"
+        return "agent"
+
     # Assemble the graph
     graph = StateGraph(AgentState)
-    graph.add_node("agent", agent_node)
-    graph.add_node("tools", tool_node)
-    graph.set_entry_point("agent")
+    graph.add_node("router", _timed_node("router", router_node))
+    graph.add_node("agent", RunnableLambda(
+        _timed_node("agent", agent_node), afunc=_timed_node("agent", agent_node_async), name="agent"
+    ))
+    graph.add_node("tools", RunnableLambda(
+        _timed_node("tools", tool_node), afunc=_timed_node("tools", tool_node_async), name="tools"
+    ))
+    graph.set_entry_point("router")
+    graph.add_conditional_edges("router", after_router, {"tools": "tools", "agent": "agent"})
     graph.add_conditional_edges("agent", should_continue, {"tools": "tools", END: END})
     graph.add_edge("tools", "agent")
 
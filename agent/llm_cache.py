@@ -0,0 +1,129 @@
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from langchain_core.messages import messages_from_dict, messages_to_dict
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from config import LLM_CACHE_MAX_ENTRIES, LLM_CACHE_MAX_ROWS, LLM_CACHE_TTL
+from database import db
+
+# Responses calling these tools have side effects and are never cached
+SIDE_EFFECT_TOOLS = {
+    "hold_ticket",
+    "checkout",
+    "group_checkout",
+    "generate_receipt",
+}
+
+_PRUNE_EVERY = 200
+
+
+def _normalize_text(content) -> str:
+    if not isinstance(content, str):
+        content = json.dumps(content, sort_keys=True, default=str)
+    return re.sub(r"\s+", " ", content).strip()
+
+
+def _normalize_message(m) -> dict:
+    """Reduce a message to what the LLM sees, without per-run ids."""
+    entry = {"type": m.type, "content": _normalize_text(m.content)}
+    tool_calls = getattr(m, "tool_calls", None)
+    if tool_calls:
+        entry["tool_calls"] = [{"name": tc["name"], "args": tc["args"]} for tc in tool_calls]
+    return entry
+
+
+class LLMResponseCache:
+    """Exact-match cache of LLM responses keyed on the normalized prompt.
+
+    Hot entries live in an in-memory LRU; all entries persist in SQLite
+    and expire after `ttl` seconds. Responses that call side-effect tools
+    (holds, checkout, receipts) are never stored, so they can never
+    be replayed.
+    """
+
+    def __init__(self, tools, model_name, max_entries=LLM_CACHE_MAX_ENTRIES, ttl=LLM_CACHE_TTL, max_rows=LLM_CACHE_MAX_ROWS):
+        schema = [convert_to_openai_tool(t) for t in tools]
+        self._prefix = json.dumps({"model": model_name, "tools": schema}, sort_keys=True, default=str)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._hot = OrderedDict()  # key -> (created_at, serialized response)
+        self._puts = 0
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, messages) -> str:
+        payload = json.dumps([_normalize_message(m) for m in messages], sort_keys=True, default=str)
+        return hashlib.sha256((self._prefix + payload).encode()).hexdigest()
+
+    @staticmethod
+    def cacheable(response) -> bool:
+        calls = getattr(response, "tool_calls", None) or []
+        return not any(tc["name"] in SIDE_EFFECT_TOOLS for tc in calls)
+
+    @staticmethod
+    def _revive(serialized):
+        response = messages_from_dict([json.loads(serialized)])[0]
+        # Fresh ids so a replayed tool call never collides with an earlier one
+        for tc in response.tool_calls:
+            tc["id"] = f"call_{uuid.uuid4().hex[:24]}"
+        return response
+
+    def get(self, messages):
+        """Return a cached response for this prompt, or None."""
+        key = self.key(messages)
+        now = time.time()
+        with self._lock:
+            entry = self._hot.get(key)
+            if entry is not None and now - entry[0] > self.ttl:
+                del self._hot[key]
+                entry = None
+            if entry is not None:
+                self._hot.move_to_end(key)
+
+        serialized = entry[1] if entry is not None else db.get_llm_cache(key, now - self.ttl)
+        if serialized is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            if entry is None:
+                self._remember(key, now, serialized)
+        return self._revive(serialized)
+
+    def put(self, messages, response) -> None:
+        """Store a response unless it calls a side-effect tool."""
+        if not self.cacheable(response):
+            return
+        key = self.key(messages)
+        serialized = json.dumps(messages_to_dict([response])[0], default=str)
+        db.put_llm_cache(key, serialized)
+        with self._lock:
+            self._remember(key, time.time(), serialized)
+            self._puts += 1
+            prune = self._puts % _PRUNE_EVERY == 0
+        if prune:
+            db.prune_llm_cache(self.max_rows, time.time() - self.ttl)
+
+    def _remember(self, key, created_at, serialized):
+        self._hot[key] = (created_at, serialized)
+        self._hot.move_to_end(key)
+        while len(self._hot) > self.max_entries:
+            self._hot.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries_in_memory": len(self._hot),
+        }
@@ -0,0 +1,162 @@
+import re
+from catalog.store import get_catalog
+
+# Deterministic parsing of clear search requests, so they can go straight
+# to search_tickets / filter_by_budget without an LLM round trip.
+
+_TYPE_WORDS = {
+    "flight": "flight", "flights": "flight", "fly": "flight", "plane": "flight",
+    "train": "train", "trains": "train", "rail": "train",
+    "movie": "movie", "movies": "movie", "film": "movie", "cinema": "movie",
+}
+
+_MONTHS = {
+    m: i + 1
+    for i, names in enumerate([
+        ("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"),
+        ("may",), ("jun", "june"), ("jul", "july"), ("aug", "august"),
+        ("sep", "sept", "september"), ("oct", "october"), ("nov", "november"), ("dec", "december"),
+    ])
+    for m in names
+}
+_MONTH_RE = "|".join(sorted(_MONTHS, key=len, reverse=True))
+
+_ISO_DATE_RE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+_DAY_MONTH_RE = re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?({_MONTH_RE})\b")
+_MONTH_DAY_RE = re.compile(rf"\b({_MONTH_RE})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?\b")
+_BUDGET_RE = re.compile(
+    r"(?:\b(?:under|below|within|at|for|budget(?:\s+of)?|max(?:imum)?|up\s*to|less\s+than|cheaper\s+than)\s*"
+    r"(?:rs\.?|inr|₹)?|(?:rs\.?|inr|₹))\s*(\d[\d,]*(?:\.\d+)?)",
+)
+# Wording that needs the LLM: relative dates, references to earlier results, booking
+# steps, negation, and constraints search_tickets can't express (time of day, sorting,
+# class, genre, duration)
+_UNCLEAR_RE = re.compile(
+    r"\b(tomorrow|today|tonight|weekend|next|this|cheapest|option|first|second|third|last|"
+    r"confirm|proceed|pay|yes|no|cancel|name|age|email|phone|"
+    r"not|don|dont|never|without|except|avoid|other|"
+    r"after|before|morning|afternoon|evening|night|am|pm|"
+    r"sort|sorted|order|fastest|earliest|latest|cheap|"
+    r"class|economy|business|sleeper|ac|window|aisle|"
+    r"genre|action|comedy|drama|horror|thriller|romance|"
+    r"hour|hours|minute|minutes|duration|direct|nonstop)\b"
+)
+# Words that carry no search criteria; anything else left over defers to the LLM
+_FILLER_WORDS = {
+    "a", "an", "the", "i", "we", "me", "us", "my", "you", "please", "hi", "hello", "hey",
+    "show", "find", "search", "look", "looking", "list", "check", "get", "see", "watch", "buy",
+    "want", "need", "would", "like", "can", "could", "do", "have", "is", "are", "there",
+    "what", "which", "any", "some", "all", "available", "playing", "showing",
+    "book", "booking", "go", "going", "travel", "travelling", "traveling", "flying",
+    "ticket", "tickets", "seat", "seats", "for", "from", "to", "in", "on", "of", "and", "with",
+    "between",
+}
+_PLACE_RE = re.compile(r"\b(?:from|to|in)\s+([a-z]+)")
+_NOT_PLACES = {"book", "fly", "go", "travel", "see", "watch", "find", "get", "buy", "the", "a", "my"}
+_MIN_BUDGET = 100
+
+
+def _find_cities(text):
+    """Return [(start, end, canonical city)] for catalog cities or aliases mentioned in `text`."""
+    found = []
+    for key, name in get_catalog().city_names().items():
+        for match in re.finditer(rf"\b{re.escape(key)}\b", text):
+            found.append((match.start(), match.end(), name))
+    return sorted(found)
+
+
+def _find_date(text, type_key):
+    """Return a YYYY-MM-DD date, "" if none was mentioned, or None if it can't be resolved."""
+    iso = _ISO_DATE_RE.search(text)
+    if iso:
+        return iso.group(1)
+
+    match = _DAY_MONTH_RE.search(text)
+    if match:
+        day, month = int(match.group(1)), _MONTHS[match.group(2)]
+    else:
+        match = _MONTH_DAY_RE.search(text)
+        if not match:
+            return ""
+        month, day = _MONTHS[match.group(1)], int(match.group(2))
+
+    # No year given: resolve against the dates actually in the catalog
+    suffix = f"-{month:02d}-{day:02d}"
+    candidates = [d for d in get_catalog().dates(type_key + "s") if d.endswith(suffix)]
+    return candidates[0] if len(candidates) == 1 else None
+
+
+def route_message(text: str):
+    """Map a clear search request to a tool call, or return None to defer to the LLM.
+
+    Returns {"name": tool_name, "args": {...}} for search_tickets or
+    filter_by_budget when the message names a ticket type plus at least one
+    of a known city, date or budget, nothing in it is ambiguous, and every
+    other word is filler.
+    """
+    text = text.lower()
+    if _UNCLEAR_RE.search(text):
+        return None
+
+    types = {_TYPE_WORDS[w] for w in re.findall(r"[a-z]+", text) if w in _TYPE_WORDS}
+    if len(types) != 1:
+        return None
+    ticket_type = types.pop()
+
+    cities = _find_cities(text)
+    if len({name for _, _, name in cities}) > 2:
+        return None
+
+    # A place we don't recognise ("from Bangalore") needs the LLM
+    city_starts = {start for start, _, _ in cities}
+    for match in _PLACE_RE.finditer(text):
+        if match.group(1) not in _NOT_PLACES and match.start(1) not in city_starts:
+            return None
+
+    origin = destination = ""
+    for pos, _, name in cities:
+        before = text[max(0, pos - 6):pos]
+        if re.search(r"\bto\s+$", before) and not destination:
+            destination = name
+        elif not origin:
+            origin = name
+        elif not destination and name != origin:
+            destination = name
+    if ticket_type == "movie" and destination:
+        return None
+
+    date = _find_date(text, ticket_type)
+    if date is None:
+        return None
+
+    undated = _MONTH_DAY_RE.sub(" ", _DAY_MONTH_RE.sub(" ", _ISO_DATE_RE.sub(" ", text)))
+    budgets = _BUDGET_RE.findall(undated)
+    if len(budgets) > 1:
+        return None
+    budget = float(budgets[0].replace(",", "")) if budgets else None
+    if budget is not None and budget < _MIN_BUDGET:
+        return None
+
+    if not (origin or destination or date or budget):
+        return None
+
+    # Every word must have been understood: with the cities, dates and budget taken
+    # out, only ticket-type and filler words may remain
+    rest = text
+    for start, end, _ in cities:
+        rest = rest[:start] + " " * (end - start) + rest[end:]
+    rest = _BUDGET_RE.sub(" ", _MONTH_DAY_RE.sub(" ", _DAY_MONTH_RE.sub(" ", _ISO_DATE_RE.sub(" ", rest))))
+    if any(w not in _TYPE_WORDS and w not in _FILLER_WORDS for w in re.findall(r"[a-z]+|\d+", rest)):
+        return None
+
+    args = {"ticket_type": ticket_type}
+    if origin:
+        args["origin"] = origin
+    if destination:
+        args["destination"] = destination
+    if date:
+        args["date"] = date
+    if budget is not None:
+        args["max_budget"] = budget
+        return {"name": "filter_by_budget", "args": args}
+    return {"name": "search_tickets", "args": args}
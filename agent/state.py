@@ -7,3 +7,5 @@ class AgentState(TypedDict):
     """State schema for the booking agent graph."""
     messages: Annotated[list, add_messages]
     steps: Annotated[list, operator.add]
+    # Whether the latest agent step was answered from the LLM response cache
+    llm_cached: bool
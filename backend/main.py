@@ -1,20 +1,106 @@
+import asyncio
 import sys
 import os
+import json
+import threading
+from contextlib import asynccontextmanager
+from datetime import date
 
 # Ensure project root is importable
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from langchain_core.messages import HumanMessage
 
-from config import GROQ_API_KEY, MODEL_NAME
-from agent.graph import build_graph
-from database.db import init_db, get_receipt_data
+from config import GROQ_API_KEY, MODEL_NAME, LLM_CACHE_ENABLED
+from backend.sessions import create_session_store
+from monitoring import metrics
+
+# The agent graph pulls in langchain_groq, langgraph and every tool, so it is
+# built off the import path: the lifespan hook starts it in the background and
+# the first request that needs it waits for it. /health answers as soon as the
+# server is up; /ready reports when the agent can take traffic.
+
+# ── Lazy startup ─────────────────────────────────────────────
+_startup_lock = threading.Lock()
+_storage_ready = False
+agent = None
+llm_cache = None
+startup_error = None
+
+
+def init_storage():
+    """Create or migrate the database and start the outbox worker, once."""
+    global _storage_ready
+    if _storage_ready:
+        return
+    with _startup_lock:
+        if not _storage_ready:
+            from database.db import init_db
+            from notifications.outbox import get_outbox_worker
+
+            init_db()
+            # Deliver any emails left in the outbox by a previous run
+            get_outbox_worker()
+            _storage_ready = True
+
+
+def get_agent():
+    """Return the compiled agent graph, building it on the first call."""
+    global agent, llm_cache
+    if agent is not None:
+        return agent
+    init_storage()
+    with _startup_lock:
+        if agent is None:
+            if not GROQ_API_KEY:
+                raise RuntimeError("GROQ_API_KEY not set. Add it to your .env file.")
+            from agent.graph import build_graph
+            from agent.llm_cache import LLMResponseCache
+            from tools import all_tools
+
+            cache = LLMResponseCache(all_tools, MODEL_NAME) if LLM_CACHE_ENABLED else None
+            agent = build_graph(GROQ_API_KEY, MODEL_NAME, llm_cache=cache)
+            llm_cache = cache
+    return agent
+
+
+def _warm_up():
+    global startup_error
+    try:
+        get_agent()
+        startup_error = None
+    except Exception as e:
+        startup_error = str(e)
+
+
+async def _ready_agent():
+    """The agent for a request handler; waits for a build still in progress."""
+    if agent is not None:
+        return agent
+    try:
+        return await asyncio.to_thread(get_agent)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Agent unavailable: {e}")
+
+
+async def _ready_storage():
+    if not _storage_ready:
+        await asyncio.to_thread(init_storage)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    warm_up = asyncio.create_task(asyncio.to_thread(_warm_up))
+    yield
+    if not warm_up.done():
+        await warm_up
+
 
 # ── Initialize ───────────────────────────────────────────────
-app = FastAPI(title="OmniBook AI", description="Autonomous Ticket Booking Agent")
+app = FastAPI(title="OmniBook AI", description="Autonomous Ticket Booking Agent", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -23,11 +109,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-init_db()
-agent = build_graph(GROQ_API_KEY, MODEL_NAME)
-
-# In-memory session store  {session_id: [messages]}
-sessions: dict = {}
+# Persistent session store with a bounded in-memory hot set
+sessions = create_session_store()
 
 
 # ── Schemas ──────────────────────────────────────────────────
@@ -41,31 +124,65 @@ class ChatResponse(BaseModel):
     steps: list[str]
 
 
+class Passenger(BaseModel):
+    name: str
+    age: int
+    email: str = ""
+    phone: str = ""
+
+
+class GroupBookingRequest(BaseModel):
+    ticket_id: str
+    passengers: list[Passenger]
+    hold_id: str = ""
+
+
+class BookingFilters(BaseModel):
+    email: str | None = None
+    transaction_id: str | None = None
+    ticket_type: str | None = None
+    date_from: date | None = None
+    date_to: date | None = None
+
+    def as_kwargs(self):
+        return {
+            "email": self.email,
+            "transaction_id": self.transaction_id,
+            # Stored singular ("flight"); accept "flights" too
+            "ticket_type": self.ticket_type.lower().rstrip("s") if self.ticket_type else None,
+            "date_from": self.date_from.isoformat() if self.date_from else None,
+            "date_to": self.date_to.isoformat() if self.date_to else None,
+        }
+
+
+# HTTP status for each non-confirmed checkout result
+_CHECKOUT_ERRORS = {"invalid": 422, "error": 404, "payment_failed": 402, "failed": 409}
+
+
 # ── Endpoints ────────────────────────────────────────────────
 @app.post("/chat", response_model=ChatResponse)
 async def chat(req: ChatRequest):
     """Send a message to the booking agent and get a response with reasoning steps."""
     if not GROQ_API_KEY:
         raise HTTPException(status_code=500, detail="GROQ_API_KEY not set. Add it to your .env file.")
+    agent = await _ready_agent()
+    from langchain_core.messages import HumanMessage
 
-    # Get or create session
-    if req.session_id not in sessions:
-        sessions[req.session_id] = []
-
-    # Append the new user message
-    sessions[req.session_id].append(HumanMessage(content=req.message))
+    # Load the session history and append the new user message
+    history = await asyncio.to_thread(sessions.get, req.session_id)
+    history.append(HumanMessage(content=req.message))
 
     # Run the agent graph
     try:
-        result = agent.invoke({
-            "messages": sessions[req.session_id],
+        result = await agent.ainvoke({
+            "messages": history,
             "steps": [],
         })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Agent error: {str(e)}")
 
     # Persist updated message history
-    sessions[req.session_id] = result["messages"]
+    await asyncio.to_thread(sessions.save, req.session_id, result["messages"])
 
     # Extract final response
     response_text = result["messages"][-1].content or "Done."
@@ -74,10 +191,130 @@ async def chat(req: ChatRequest):
     return ChatResponse(response=response_text, steps=steps)
 
 
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream(req: ChatRequest):
+    """Stream the agent's reply as Server-Sent Events.
+
+    Events: `token` (LLM output chunk), `tool_start`, `tool_end`, `step`,
+    and a final `done` (or `error`) carrying the full response and steps.
+    """
+    if not GROQ_API_KEY:
+        raise HTTPException(status_code=500, detail="GROQ_API_KEY not set. Add it to your .env file.")
+    agent = await _ready_agent()
+    from langchain_core.messages import AIMessageChunk, HumanMessage
+
+    history = await asyncio.to_thread(sessions.get, req.session_id)
+    history.append(HumanMessage(content=req.message))
+
+    async def event_stream():
+        final_state = None
+        steps = []
+        try:
+            async for mode, event in agent.astream(
+                {"messages": history, "steps": []},
+                stream_mode=["messages", "updates", "values"],
+            ):
+                if mode == "messages":
+                    chunk, metadata = event
+                    if (
+                        isinstance(chunk, AIMessageChunk)
+                        and chunk.content
+                        and metadata.get("langgraph_node") == "agent"
+                    ):
+                        yield _sse("token", {"content": chunk.content})
+                elif mode == "updates":
+                    for node, update in event.items():
+                        for m in update.get("messages", []):
+                            if node in ("agent", "router"):
+                                for tc in getattr(m, "tool_calls", None) or []:
+                                    yield _sse("tool_start", {"id": tc["id"], "name": tc["name"], "args": tc["args"]})
+                            elif node == "tools":
+                                yield _sse("tool_end", {"id": m.tool_call_id, "name": m.name, "content": m.content})
+                        for step in update.get("steps", []):
+                            steps.append(step)
+                            yield _sse("step", {"step": step})
+                else:
+                    final_state = event
+        except Exception as e:
+            yield _sse("error", {"detail": f"Agent error: {str(e)}"})
+            return
+
+        await asyncio.to_thread(sessions.save, req.session_id, final_state["messages"])
+        response_text = final_state["messages"][-1].content or "Done."
+        yield _sse("done", {"response": response_text, "steps": steps})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/bookings/group")
+async def group_booking(req: GroupBookingRequest):
+    """Book one ticket for several passengers (one payment, one receipt and email) without the agent.
+
+    Passengers after the first may omit email and phone to use the first passenger's.
+    """
+    await _ready_storage()
+    from tools.checkout import run_group_checkout
+
+    passengers = [p.model_dump() for p in req.passengers]
+    result = await asyncio.to_thread(run_group_checkout, req.ticket_id, passengers, req.hold_id)
+    if result["status"] != "confirmed":
+        raise HTTPException(status_code=_CHECKOUT_ERRORS.get(result["status"], 400), detail=result)
+    return result
+
+
+@app.get("/bookings")
+async def booking_history(
+    filters: BookingFilters = Depends(),
+    cursor: int | None = None,
+    limit: int = Query(50, ge=1, le=500),
+):
+    """List bookings matching all given filters (email, transaction_id, ticket_type,
+    travel date_from/date_to), newest first.
+
+    Rows are arrays in `columns` order. Pass `next_cursor` back as `cursor`
+    for the next page; it is null on the last page.
+    """
+    await _ready_storage()
+    from database import db
+
+    rows, next_cursor = await asyncio.to_thread(
+        db.list_bookings, before_id=cursor, limit=limit, **filters.as_kwargs()
+    )
+    return {"columns": db.BOOKING_HISTORY_COLUMNS, "rows": rows, "next_cursor": next_cursor}
+
+
+@app.get("/bookings/export")
+async def export_bookings(filters: BookingFilters = Depends()):
+    """Stream every matching booking as NDJSON (one JSON object per line), newest first."""
+    await _ready_storage()
+    from database import db
+
+    def pages():
+        # A sync generator, so Starlette runs it on a worker thread; one chunk per page
+        for rows in db.iter_booking_pages(**filters.as_kwargs()):
+            yield "".join(
+                json.dumps(dict(zip(db.BOOKING_HISTORY_COLUMNS, row)), default=str) + "\n" for row in rows
+            )
+
+    return StreamingResponse(pages(), media_type="application/x-ndjson")
+
+
 @app.get("/receipt/{booking_id}")
 async def get_receipt(booking_id: int):
     """Retrieve receipt data for a booking by ID."""
-    data = get_receipt_data(booking_id)
+    await _ready_storage()
+    from database.db import get_receipt_data
+
+    data = await asyncio.to_thread(get_receipt_data, booking_id)
     if not data:
         raise HTTPException(status_code=404, detail=f"Booking #{booking_id} not found")
     return data
@@ -86,17 +323,41 @@ async def get_receipt(booking_id: int):
 @app.delete("/session/{session_id}")
 async def clear_session(session_id: str):
     """Clear a chat session to start fresh."""
-    if session_id in sessions:
-        del sessions[session_id]
+    await _ready_storage()
+    await asyncio.to_thread(sessions.delete, session_id)
     return {"message": f"Session '{session_id}' cleared"}
 
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """LLM response cache hit/miss counters."""
+    if llm_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **llm_cache.stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Node, tool, database, SMTP and LLM token metrics in Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/health")
 async def health():
-    """Health check endpoint."""
+    """Liveness check: the server is up (the agent may still be starting)."""
     return {"status": "ok", "service": "OmniBook AI"}
 
 
+@app.get("/ready")
+async def ready():
+    """Readiness check: 200 once the agent is built, 503 while starting or if startup failed."""
+    if agent is not None:
+        return {"status": "ready"}
+    if startup_error:
+        return JSONResponse({"status": "error", "detail": startup_error}, status_code=503)
+    return JSONResponse({"status": "starting"}, status_code=503)
+
+
 # ── Dev entry point ──────────────────────────────────────────
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,143 @@
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from config import (
+    SESSION_BACKEND,
+    SESSION_CACHE_MAX_BYTES,
+    SESSION_CACHE_MAX_ENTRIES,
+    SESSION_CACHE_TTL,
+)
+from database import db
+
+
+class SessionStore(ABC):
+    """Chat history storage keyed by session_id."""
+
+    @abstractmethod
+    def get(self, session_id: str) -> list:
+        """Return a copy of the session's messages (empty list if unknown)."""
+
+    @abstractmethod
+    def save(self, session_id: str, messages: list) -> None:
+        """Replace the session's messages."""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        """Forget the session; unknown ids are ignored."""
+
+
+class InMemorySessionStore(SessionStore):
+    """Unbounded per-process store; only suitable for a single dev worker."""
+
+    def __init__(self):
+        self._sessions = {}
+
+    def get(self, session_id):
+        return list(self._sessions.get(session_id, []))
+
+    def save(self, session_id, messages):
+        self._sessions[session_id] = list(messages)
+
+    def delete(self, session_id):
+        self._sessions.pop(session_id, None)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions persisted in SQLite with a bounded in-memory hot set.
+
+    The hot set is an LRU capped by entry count and serialized byte size,
+    and entries idle for longer than `ttl` seconds are dropped. A cached
+    entry is only reused while its revision matches the database, so
+    several uvicorn workers can share sessions safely.
+    """
+
+    def __init__(self, max_entries=SESSION_CACHE_MAX_ENTRIES, max_bytes=SESSION_CACHE_MAX_BYTES, ttl=SESSION_CACHE_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._hot = OrderedDict()  # session_id -> (revision, messages, size, last_access)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cached_bytes(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._hot)
+
+    def _drop(self, session_id):
+        entry = self._hot.pop(session_id, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def _evict(self, now):
+        while self._hot:
+            session_id, (_, _, _, last_access) = next(iter(self._hot.items()))
+            over_budget = len(self._hot) > self.max_entries or self._bytes > self.max_bytes
+            if not over_budget and now - last_access <= self.ttl:
+                return
+            self._drop(session_id)
+
+    def _remember(self, session_id, revision, messages, size):
+        now = time.monotonic()
+        with self._lock:
+            self._drop(session_id)
+            self._hot[session_id] = (revision, messages, size, now)
+            self._bytes += size
+            self._evict(now)
+
+    def get(self, session_id):
+        revision = db.get_session_revision(session_id)
+        if revision is None:
+            with self._lock:
+                self._drop(session_id)
+            return []
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._hot.get(session_id)
+            if entry is not None and entry[0] == revision and now - entry[3] <= self.ttl:
+                self._hot[session_id] = entry[:3] + (now,)
+                self._hot.move_to_end(session_id)
+                self.hits += 1
+                return list(entry[1])
+            self.misses += 1
+
+        loaded = db.load_session(session_id)
+        if loaded is None:
+            return []
+        revision, payload = loaded
+        # Imported here, not at module level, to keep langchain off the server's import path
+        from langchain_core.messages import messages_from_dict
+
+        messages = messages_from_dict(json.loads(payload))
+        self._remember(session_id, revision, messages, len(payload.encode()))
+        return list(messages)
+
+    def save(self, session_id, messages):
+        messages = list(messages)
+        from langchain_core.messages import messages_to_dict
+
+        payload = json.dumps(messages_to_dict(messages), default=str)
+        revision = db.save_session(session_id, payload)
+        self._remember(session_id, revision, messages, len(payload.encode()))
+
+    def delete(self, session_id):
+        db.delete_session(session_id)
+        with self._lock:
+            self._drop(session_id)
+
+
+def create_session_store() -> SessionStore:
+    """Build the session store selected by SESSION_BACKEND ('sqlite' or 'memory')."""
+    if SESSION_BACKEND == "memory":
+        return InMemorySessionStore()
+    if SESSION_BACKEND == "sqlite":
+        return SQLiteSessionStore()
+    raise ValueError(f"Unknown SESSION_BACKEND '{SESSION_BACKEND}'. Choose from: sqlite, memory.")
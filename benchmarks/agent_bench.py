@@ -0,0 +1,361 @@
+"""Offline benchmark of full booking conversations through the agent, with a
+scripted chat model in place of Groq.
+
+Each conversation searches, picks a ticket, gives passenger details and
+confirms payment. Runs through the compiled graph (`graph` mode) and the
+FastAPI /chat endpoint (`api` mode, needs httpx) at several concurrency
+levels, against a throwaway database. Reports end-to-end turn latency
+(p50/p95/p99), per-node and per-tool latency, time spent holding DB
+connections, and prompt size per LLM call.
+
+    python benchmarks/agent_bench.py [--modes graph,api] [--concurrency 1,4,16]
+        [--conversations 20] [--llm-latency-ms 0] [--llm-cache] [--json out.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Ensure project root is importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_TICKET_ID_RE = re.compile(r"\b([A-Z]{2}\d{3})\b")
+_DETAILS_RE = re.compile(r"name is (.+?), age (\d+), email (\S+), phone (\S+)")
+_REPLY = (
+    "Here is what I found. Let me know which option you'd like, or tell me if you "
+    "want to change the date, time or budget and I will search again for you."
+)
+
+
+def _conversation(n):
+    """User messages of one booking conversation."""
+    return [
+        "Find flights from Kolkata to Delhi",
+        "I'll take FL001",
+        f"My name is Guest Number{n}, age 30, email guest{n}@example.com, phone 9876543210",
+        "Yes, proceed with payment",
+    ]
+
+
+def _percentiles(values):
+    if not values:
+        return {}
+    ordered = sorted(values)
+    pick = lambda pct: ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+    return {
+        "n": len(values),
+        "mean": round(statistics.fmean(values), 2),
+        "p50": round(pick(50), 2),
+        "p95": round(pick(95), 2),
+        "p99": round(pick(99), 2),
+    }
+
+
+def make_scripted_model(latency_ms=0.0):
+    """Build a deterministic chat model that plays the booking agent's side.
+
+    It is stateless (decisions depend only on the messages it is given), so
+    one instance can serve any number of concurrent conversations.
+    """
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+    from agent.context import estimate_tokens
+
+    def last_tool_result(messages, name):
+        for m in reversed(messages):
+            if isinstance(m, ToolMessage) and m.name == name:
+                return json.loads(m.content)
+        return None
+
+    def plan(messages):
+        """Next tool call for the latest user message, or None to reply in text."""
+        if isinstance(messages[-1], ToolMessage):
+            return None
+        text = str(next(m for m in reversed(messages) if isinstance(m, HumanMessage)).content)
+        details = _DETAILS_RE.search(text)
+        if details:
+            name, age, email, phone = details.groups()
+            return "collect_passenger_details", {"name": name, "age": int(age), "email": email, "phone": phone}
+        ticket = _TICKET_ID_RE.search(text)
+        if ticket:
+            return "hold_ticket", {"ticket_type": "flight", "ticket_id": ticket.group(1)}
+        if "proceed" in text:
+            hold = last_tool_result(messages, "hold_ticket") or {}
+            passenger = (last_tool_result(messages, "collect_passenger_details") or {}).get("passenger", {})
+            return "checkout", {
+                "ticket_id": hold.get("ticket_id", "FL001"),
+                "passenger_name": passenger.get("name", ""),
+                "passenger_age": passenger.get("age", 0),
+                "passenger_email": passenger.get("email", ""),
+                "passenger_phone": passenger.get("phone", ""),
+                "hold_id": hold.get("hold_id", ""),
+            }
+        return None
+
+    class ScriptedChatModel(BaseChatModel):
+        latency: float = 0.0
+        prompts: list = []
+        lock: object = None
+
+        @property
+        def _llm_type(self):
+            return "scripted"
+
+        def bind_tools(self, tools, **kwargs):
+            return self
+
+        def _respond(self, messages):
+            turn = sum(isinstance(m, HumanMessage) for m in messages)
+            with self.lock:
+                self.prompts.append((turn, estimate_tokens(messages), len(messages)))
+            call = plan(messages)
+            if call is None:
+                message = AIMessage(content=_REPLY)
+            else:
+                name, args = call
+                message = AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": f"call_{turn}_{name}"}])
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            time.sleep(self.latency)
+            return self._respond(messages)
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+            await asyncio.sleep(self.latency)
+            return self._respond(messages)
+
+    return ScriptedChatModel(latency=latency_ms / 1000, prompts=[], lock=threading.Lock())
+
+
+class _TimedPool:
+    """Wraps the DB connection pool to total the time connections are held."""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.total = 0.0
+            self.count = 0
+
+    def acquire(self):
+        conn = self.pool.acquire()
+        self.local.__dict__.setdefault("started", []).append(time.perf_counter())
+        return conn
+
+    def release(self, conn):
+        elapsed = time.perf_counter() - self.local.started.pop()
+        with self.lock:
+            self.total += elapsed
+            self.count += 1
+        self.pool.release(conn)
+
+    def __getattr__(self, name):
+        return getattr(self.pool, name)
+
+
+class _Recorder:
+    """Thread-safe collection of timings for one benchmark run."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.turns = []
+        self.conversations = []
+        self.nodes = {}
+        self.tools = {}
+        self.errors = 0
+
+    def add(self, bucket, key, value):
+        with self.lock:
+            bucket.setdefault(key, []).append(value)
+
+    def add_steps(self, steps):
+        for step in steps:
+            match = re.match(r"Result \[(\w+)\] \((\d+) ms\)", step)
+            if match:
+                self.add(self.tools, match.group(1), float(match.group(2)))
+
+
+def _run_graph_conversation(graph, n, recorder):
+    from langchain_core.messages import HumanMessage
+
+    history = []
+    started = time.perf_counter()
+    for text in _conversation(n):
+        turn_started = last = time.perf_counter()
+        final = None
+        for mode, event in graph.stream(
+            {"messages": history + [HumanMessage(content=text)], "steps": []},
+            stream_mode=["updates", "values"],
+        ):
+            if mode == "values":
+                final = event
+                continue
+            now = time.perf_counter()
+            for node, update in event.items():
+                recorder.add(recorder.nodes, node, (now - last) * 1000)
+                recorder.add_steps((update or {}).get("steps", []))
+            last = now
+        with recorder.lock:
+            recorder.turns.append((time.perf_counter() - turn_started) * 1000)
+        history = final["messages"]
+    with recorder.lock:
+        recorder.conversations.append((time.perf_counter() - started) * 1000)
+
+
+def run_graph(graph, concurrency, conversations, offset):
+    recorder = _Recorder()
+    wall = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(_run_graph_conversation, graph, offset + n, recorder) for n in range(conversations)]
+        for future in futures:
+            try:
+                future.result()
+            except Exception:
+                recorder.errors += 1
+    return recorder, time.perf_counter() - wall
+
+
+def run_api(app, concurrency, conversations, offset):
+    import httpx
+
+    recorder = _Recorder()
+
+    async def conversation(client, semaphore, n):
+        async with semaphore:
+            started = time.perf_counter()
+            for text in _conversation(n):
+                turn_started = time.perf_counter()
+                response = await client.post("/chat", json={"session_id": f"bench-{n}", "message": text})
+                response.raise_for_status()
+                recorder.add_steps(response.json()["steps"])
+                recorder.turns.append((time.perf_counter() - turn_started) * 1000)
+            recorder.conversations.append((time.perf_counter() - started) * 1000)
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            results = await asyncio.gather(
+                *(conversation(client, semaphore, offset + n) for n in range(conversations)),
+                return_exceptions=True,
+            )
+        recorder.errors = sum(isinstance(r, Exception) for r in results)
+
+    wall = time.perf_counter()
+    asyncio.run(main())
+    return recorder, time.perf_counter() - wall
+
+
+def _summarize(mode, concurrency, recorder, wall, pool, model, prompts_from):
+    prompts = model.prompts[prompts_from:]
+    by_turn = {}
+    for turn, tokens, _count in prompts:
+        by_turn.setdefault(turn, []).append(tokens)
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "conversations": len(recorder.conversations),
+        "errors": recorder.errors,
+        "wall_s": round(wall, 3),
+        "turns_per_s": round(len(recorder.turns) / wall, 2) if wall else 0.0,
+        "turn_ms": _percentiles(recorder.turns),
+        "conversation_ms": _percentiles(recorder.conversations),
+        "node_ms": {node: _percentiles(v) for node, v in sorted(recorder.nodes.items())},
+        "tool_ms": {tool: _percentiles(v) for tool, v in sorted(recorder.tools.items())},
+        "db": {
+            "connection_uses": pool.count,
+            "held_ms_total": round(pool.total * 1000, 2),
+            "held_ms_per_turn": round(pool.total * 1000 / len(recorder.turns), 3) if recorder.turns else 0.0,
+        },
+        "llm_calls": len(prompts),
+        "prompt_tokens_by_turn": {turn: _percentiles(v) for turn, v in sorted(by_turn.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--modes", default="graph,api", help="comma-separated: graph, api")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated concurrency levels")
+    parser.add_argument("--conversations", type=int, default=20, help="conversations per level")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="simulated LLM response time")
+    parser.add_argument("--llm-cache", action="store_true", help="keep the LLM response cache enabled")
+    parser.add_argument("--json", dest="json_out", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    # Isolated, offline environment; must be set before project modules import config
+    os.environ["DATABASE_PATH"] = os.path.join(tempfile.mkdtemp(), "agent_bench.db")
+    os.environ["GROQ_API_KEY"] = "offline-benchmark"
+    os.environ["SMTP_EMAIL"] = ""
+    os.environ["LLM_CACHE_ENABLED"] = "1" if args.llm_cache else "0"
+
+    import agent.graph
+    from database import db
+
+    model = make_scripted_model(args.llm_latency_ms)
+    agent.graph.ChatGroq = lambda **kwargs: model
+    db.init_db()
+    pool = db._pool = _TimedPool(db._pool)
+
+    from catalog.store import get_catalog
+    get_catalog().query("flights", limit=1)
+    with db.connection() as conn:
+        for table in ("flights", "trains", "movies"):
+            conn.execute(f"UPDATE {table} SET seats_available = 1000000")
+
+    levels = [int(c) for c in args.concurrency.split(",") if c]
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    results = []
+    offset = 0
+
+    for mode in modes:
+        if mode == "graph":
+            target = agent.graph.build_graph("offline-benchmark", "scripted")
+            runner = run_graph
+        elif mode == "api":
+            try:
+                import httpx  # noqa: F401
+            except ImportError:
+                print("api mode needs httpx (pip install httpx); skipping")
+                continue
+            from backend.main import app as target
+            runner = run_api
+        else:
+            parser.error(f"unknown mode '{mode}'")
+
+        # Warm-up conversation (imports, prepared statements, catalog indexes)
+        runner(target, 1, 1, offset)
+        offset += 1
+        for concurrency in levels:
+            pool.reset()
+            prompts_from = len(model.prompts)
+            recorder, wall = runner(target, concurrency, args.conversations, offset)
+            offset += args.conversations
+            results.append(_summarize(mode, concurrency, recorder, wall, pool, model, prompts_from))
+
+    print(f"{'mode':<6} {'conc':>4} {'turns/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'llm':>5} {'db ms/turn':>10} {'err':>4}")
+    for r in results:
+        t = r["turn_ms"]
+        print(
+            f"{r['mode']:<6} {r['concurrency']:>4} {r['turns_per_s']:>8} {t.get('p50', 0):>8} {t.get('p95', 0):>8} "
+            f"{t.get('p99', 0):>8} {r['llm_calls']:>5} {r['db']['held_ms_per_turn']:>10} {r['errors']:>4}"
+        )
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
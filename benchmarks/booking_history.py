@@ -0,0 +1,138 @@
+"""Time booking history lookups on a large bookings table: first page and a
+deep page per filter (keyset on bookings.id vs the OFFSET equivalent), and
+NDJSON-style export throughput. Runs against a throwaway database.
+
+    python benchmarks/booking_history.py [--bookings 1000000] [--page-size 50]
+        [--depth 1000] [--plans] [--json out.json]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Ensure project root is importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_TYPES = ("flight", "train", "movie")
+
+
+def seed(db, count, seed_value=7):
+    """Insert `count` bookings (and one user per 3 bookings) directly, in batches."""
+    rng = random.Random(seed_value)
+    users = max(1, count // 3)
+    with db.connection() as conn:
+        conn.executemany(
+            "INSERT INTO users (name, email, phone, age) VALUES (?, ?, ?, ?)",
+            ((f"User {u}", f"user{u}@example.com", "9999999999", 30) for u in range(users)),
+        )
+    batch = 100_000
+    for start in range(0, count, batch):
+        rows = []
+        for n in range(start, min(start + batch, count)):
+            user = rng.randint(1, users)
+            rows.append((
+                user, rng.choice(_TYPES), f"FL{n % 500:03d}", "Kolkata", "Delhi",
+                f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", 4800, f"TXN-{n:08d}", f"User {user - 1}", 30,
+            ))
+        with db.connection() as conn:
+            conn.executemany(db._INSERT_BOOKING, rows)
+
+
+def _time_ms(fn, repeats=5):
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return best
+
+
+def _offset_page(db, filters, offset, limit):
+    sql, params = db._history_query(before_id=None, limit=limit, **filters)
+    with db.connection() as conn:
+        return conn.execute(sql.replace("LIMIT ?", "LIMIT ? OFFSET ?"), params + [offset]).fetchall()
+
+
+def _keyset_page_at(db, filters, depth, limit):
+    """Cursor of page `depth`, found by walking pages (untimed), as a client would hold it."""
+    before_id = None
+    for _ in range(depth):
+        _rows, before_id = db.list_bookings(before_id=before_id, limit=limit, **filters)
+        if before_id is None:
+            break
+    return before_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--depth", type=int, default=1000, help="page number of the deep-page lookup")
+    parser.add_argument("--plans", action="store_true", help="print the query plan of each filter")
+    parser.add_argument("--json", dest="json_out", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_PATH"] = os.path.join(tempfile.mkdtemp(), "history.db")
+    from database import db
+
+    db.init_db()
+    started = time.perf_counter()
+    seed(db, args.bookings)
+    print(f"seeded {args.bookings} bookings in {time.perf_counter() - started:.1f}s")
+
+    cases = {
+        "all": {},
+        "email": {"email": "user42@example.com"},
+        "transaction_id": {"transaction_id": f"TXN-{args.bookings // 2:08d}"},
+        "ticket_type": {"ticket_type": "train"},
+        "date_range": {"date_from": "2026-03-01", "date_to": "2026-03-07"},
+        "type_and_dates": {"ticket_type": "flight", "date_from": "2026-06-01", "date_to": "2026-06-30"},
+        "type_and_day": {"ticket_type": "flight", "date_from": "2026-06-01", "date_to": "2026-06-01"},
+    }
+    limit = args.page_size
+    results = []
+    for name, filters in cases.items():
+        cursor = _keyset_page_at(db, filters, args.depth - 1, limit)
+        offset = (args.depth - 1) * limit
+        result = {
+            "filter": name,
+            "first_page_ms": round(_time_ms(lambda: db.list_bookings(limit=limit, **filters)), 3),
+            "deep_keyset_ms": round(_time_ms(lambda: db.list_bookings(before_id=cursor, limit=limit, **filters)), 3)
+            if cursor else None,
+            "deep_offset_ms": round(_time_ms(lambda: _offset_page(db, filters, offset, limit)), 3) if cursor else None,
+        }
+        results.append(result)
+        if args.plans:
+            sql, params = db._history_query(before_id=1, limit=limit, **filters)
+            with db.connection() as conn:
+                plan = [r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+            print(f"{name}: {' / '.join(plan)}")
+
+    print(f"{'filter':<15} {'page 1 ms':>10} {f'page {args.depth} keyset':>18} {f'page {args.depth} OFFSET':>18}")
+    for r in results:
+        keyset = f"{r['deep_keyset_ms']:.3f}" if r["deep_keyset_ms"] is not None else "-"
+        offset = f"{r['deep_offset_ms']:.3f}" if r["deep_offset_ms"] is not None else "-"
+        print(f"{r['filter']:<15} {r['first_page_ms']:>10.3f} {keyset:>18} {offset:>18}")
+
+    started = time.perf_counter()
+    exported = size = 0
+    for rows in db.iter_booking_pages(ticket_type="movie"):
+        chunk = "".join(json.dumps(dict(zip(db.BOOKING_HISTORY_COLUMNS, row))) + "\n" for row in rows)
+        exported += len(rows)
+        size += len(chunk)
+    elapsed = time.perf_counter() - started
+    print(f"export ticket_type=movie: {exported} rows, {size / 1e6:.1f} MB in {elapsed:.2f}s ({exported / elapsed:,.0f} rows/s)")
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump({
+                "config": vars(args), "results": results,
+                "export": {"rows": exported, "bytes": size, "seconds": round(elapsed, 3)},
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Compare booking a group one passenger at a time (N checkouts) with one
+group checkout, against a throwaway database. Confirmation emails are
+rendered and written to the outbox, but not delivered.
+
+    python benchmarks/group_booking.py [--sizes 1,2,5,10] [--repeats 50] [--json out.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Ensure project root is importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TICKET_ID = "FL001"
+
+
+def _passengers(size, n):
+    lead = {"name": f"Guest {n}", "age": 40, "email": f"family{n}@example.com", "phone": "9999999999"}
+    return [lead] + [{"name": f"Member {n}-{i}", "age": 10 + i} for i in range(1, size)]
+
+
+def _measure(book, repeats):
+    from monitoring.metrics import DB_CONNECTION_SECONDS
+
+    times = []
+    connections_before = DB_CONNECTION_SECONDS.count()
+    for n in range(repeats):
+        started = time.perf_counter()
+        book(n)
+        times.append((time.perf_counter() - started) * 1000)
+    return {
+        "ms_p50": round(statistics.median(times), 3),
+        "ms_mean": round(statistics.fmean(times), 3),
+        "connections": round((DB_CONNECTION_SECONDS.count() - connections_before) / repeats, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", default="1,2,5,10", help="comma-separated group sizes")
+    parser.add_argument("--repeats", type=int, default=50, help="groups booked per size and mode")
+    parser.add_argument("--json", dest="json_out", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_PATH"] = os.path.join(tempfile.mkdtemp(), "group_booking.db")
+    os.environ["SMTP_EMAIL"] = "bench@example.com"
+    from catalog.store import get_catalog
+    from database import db
+    from notifications import outbox
+    from tools.checkout import run_checkout, run_group_checkout
+
+    db.init_db()
+    # Queue emails without a running worker, so nothing is delivered
+    outbox._worker = outbox.OutboxWorker()
+    get_catalog().get_ticket(TICKET_ID)
+    with db.connection() as conn:
+        conn.execute("UPDATE flights SET seats_available = 1000000")
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",") if s):
+        def one_at_a_time(n, size=size):
+            group = _passengers(size, n)
+            for p in group:
+                result = run_checkout(
+                    TICKET_ID, p["name"], p["age"], p.get("email", group[0]["email"]),
+                    p.get("phone", group[0]["phone"]),
+                )
+                assert result["status"] == "confirmed", result
+
+        def as_group(n, size=size):
+            result = run_group_checkout(TICKET_ID, _passengers(size, n))
+            assert result["status"] == "confirmed", result
+
+        # Warm-up (prepared statements, template and catalog caches)
+        one_at_a_time(-1)
+        as_group(-1)
+        results.append({
+            "size": size,
+            "separate": _measure(one_at_a_time, args.repeats),
+            "group": _measure(as_group, args.repeats),
+        })
+
+    print(f"{'size':>4} {'separate ms':>12} {'group ms':>9} {'speedup':>8} {'conns sep':>10} {'conns grp':>10}")
+    for r in results:
+        sep, grp = r["separate"], r["group"]
+        print(
+            f"{r['size']:>4} {sep['ms_p50']:>12.2f} {grp['ms_p50']:>9.2f} {sep['ms_p50'] / grp['ms_p50']:>7.1f}x "
+            f"{sep['connections']:>10} {grp['connections']:>10}"
+        )
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
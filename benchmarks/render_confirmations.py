@@ -0,0 +1,49 @@
+"""Time rendering confirmation emails and text receipts for many bookings,
+as in a batch resend. Runs against a throwaway database.
+
+    python benchmarks/render_confirmations.py [--bookings 5000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Ensure project root is importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--bookings", type=int, default=5000)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_PATH"] = os.path.join(tempfile.mkdtemp(), "render.db")
+    from database.db import create_booking, get_receipts_data, init_db
+    from notifications.receipts import Receipt, render_confirmation, render_receipt_text
+
+    init_db()
+    for n in range(args.bookings):
+        create_booking(
+            f"Guest {n}", f"guest{n}@example.com", "9999999999", 30, "flight", "FL001",
+            "Kolkata", "Delhi", "2026-03-01", 4800, f"TXN-{n}",
+        )
+
+    started = time.perf_counter()
+    rows = get_receipts_data(range(1, args.bookings + 1))
+    fetched = time.perf_counter()
+
+    size = 0
+    for row in rows:
+        receipt = Receipt(row)
+        subject, html_body, text_body = render_confirmation(receipt)
+        size += len(html_body) + len(text_body) + len(render_receipt_text(receipt))
+    rendered = time.perf_counter()
+
+    per = (rendered - fetched) / len(rows) * 1e6
+    print(f"bookings={len(rows)} fetch={(fetched - started) * 1000:.1f}ms render={(rendered - fetched) * 1000:.1f}ms")
+    print(f"  {per:.1f}us per booking (email subject + HTML + text, and text receipt), {size / len(rows):.0f} chars")
+
+
+if __name__ == "__main__":
+    main()
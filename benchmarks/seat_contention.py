@@ -0,0 +1,118 @@
+"""Hundreds of concurrent sessions racing for the seats of one popular show.
+
+Each session holds a seat, takes a moment to "check out", then books it or
+walks away (its hold expires and the seat goes back). Checks that nothing is
+oversold and reports hold/booking latency and throughput. Runs against a
+throwaway database unless --db is given.
+
+    python benchmarks/seat_contention.py [--sessions 300] [--seats 50] [--abandon 0.3]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+# Ensure project root is importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sessions", type=int, default=300)
+    parser.add_argument("--seats", type=int, default=50)
+    parser.add_argument("--abandon", type=float, default=0.3, help="share of sessions that never book")
+    parser.add_argument("--hold-ttl", type=float, default=0.5, help="seconds before an abandoned hold expires")
+    parser.add_argument("--db", help="database path (default: a temporary file)")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_PATH"] = args.db or os.path.join(tempfile.mkdtemp(), "contention.db")
+    os.environ["CATALOG_BACKEND"] = "sqlite"
+    from catalog.sqlite_store import SQLiteTicketCatalog
+    from catalog.store import SoldOutError
+    from database.db import connection, create_booking
+
+    catalog = SQLiteTicketCatalog()
+    ticket_id = catalog.query("movies", limit=1)[0][0]["id"]
+    with connection() as conn:
+        conn.execute("UPDATE movies SET seats_available = ? WHERE id = ?", (args.seats, ticket_id))
+
+    lock = threading.Lock()
+    hold_ms, book_ms = [], []
+    counts = {"held": 0, "sold_out": 0, "booked": 0, "abandoned": 0, "lost_hold": 0}
+    start_gate = threading.Barrier(args.sessions)
+
+    def session(n):
+        start_gate.wait()
+        started = time.perf_counter()
+        try:
+            hold = catalog.hold_seats("movie", ticket_id, ttl=args.hold_ttl)
+        except SoldOutError:
+            with lock:
+                counts["sold_out"] += 1
+            return
+        with lock:
+            hold_ms.append((time.perf_counter() - started) * 1000)
+            counts["held"] += 1
+
+        time.sleep(random.uniform(0, args.hold_ttl / 2))
+        if random.random() < args.abandon:
+            with lock:
+                counts["abandoned"] += 1
+            return
+
+        started = time.perf_counter()
+        try:
+            create_booking(
+                f"Guest {n}", f"guest{n}@example.com", "9999999999", 30, "movie", ticket_id,
+                "Mumbai", "", "2026-03-01", 250, f"TXN-{n}", catalog=catalog, hold_id=hold["hold_id"],
+            )
+        except SoldOutError:
+            with lock:
+                counts["lost_hold"] += 1
+            return
+        with lock:
+            book_ms.append((time.perf_counter() - started) * 1000)
+            counts["booked"] += 1
+
+    wall = time.perf_counter()
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(args.sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall
+
+    time.sleep(args.hold_ttl)
+    catalog.release_expired_holds()
+    with connection() as conn:
+        seats_left = conn.execute("SELECT seats_available FROM movies WHERE id = ?", (ticket_id,)).fetchone()[0]
+        booked = conn.execute("SELECT COUNT(*) FROM bookings WHERE ticket_id = ?", (ticket_id,)).fetchone()[0]
+        live_holds = conn.execute("SELECT COUNT(*) FROM seat_holds WHERE ticket_id = ?", (ticket_id,)).fetchone()[0]
+
+    print(f"sessions={args.sessions} seats={args.seats} wall={wall:.2f}s")
+    print("  " + "  ".join(f"{k}={v}" for k, v in counts.items()))
+    for name, values in (("hold", hold_ms), ("book", book_ms)):
+        if values:
+            print(
+                f"  {name:<5} p50={statistics.median(values):.1f}ms p95={_percentile(values, 95):.1f}ms "
+                f"p99={_percentile(values, 99):.1f}ms"
+            )
+    print(f"  seats_left={seats_left} bookings={booked} live_holds={live_holds}")
+
+    if booked + seats_left != args.seats or seats_left < 0 or live_holds:
+        print("FAIL: seat accounting does not add up")
+        sys.exit(1)
+    print("OK: no seat sold twice, every abandoned hold returned")
+
+
+if __name__ == "__main__":
+    main()
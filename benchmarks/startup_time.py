@@ -0,0 +1,107 @@
+"""Measure backend cold start: how long `import backend.main` takes (the time
+before uvicorn can answer /health) and how long until the agent is ready.
+
+Each run is a fresh interpreter against the same throwaway database; the
+first run also creates and seeds it and is reported separately. With
+--top, the slowest imports under backend.main (from -X importtime) are listed.
+
+    python benchmarks/startup_time.py [--runs 5] [--top 10] [--json out.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import backend.main
+imported = time.perf_counter()
+modules = len(sys.modules)
+backend.main.get_agent()
+ready = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "ready_ms": (ready - started) * 1000,
+    "modules_at_import": modules,
+    "modules_at_ready": len(sys.modules),
+}))
+"""
+
+
+def _env(db_path):
+    env = dict(os.environ)
+    env.update(DATABASE_PATH=db_path, GROQ_API_KEY="startup-benchmark", SMTP_EMAIL="", PYTHONPATH=ROOT)
+    return env
+
+
+def run_once(db_path):
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD], env=_env(db_path), cwd=ROOT,
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(db_path, top):
+    """(module, cumulative ms) of the slowest imports directly under backend.main, by -X importtime."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"], env=_env(db_path), cwd=ROOT,
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(cumulative) / 1000, depth))
+    top_level = [(name, ms) for name, ms, depth in rows if depth == 1]
+    return sorted(top_level, key=lambda r: -r[1])[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--runs", type=int, default=5, help="timed restarts after the first start")
+    parser.add_argument("--top", type=int, default=0, help="list the N slowest imports under backend.main")
+    parser.add_argument("--json", dest="json_out", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "startup.db")
+    first = run_once(db_path)
+    runs = [run_once(db_path) for _ in range(args.runs)]
+
+    summary = {
+        "first_start": {k: round(v, 1) for k, v in first.items()},
+        "restart": {
+            key: round(statistics.median(r[key] for r in runs), 1)
+            for key in ("import_ms", "ready_ms", "modules_at_import", "modules_at_ready")
+        },
+    }
+    print(f"first start (new database): import {first['import_ms']:.0f} ms, agent ready {first['ready_ms']:.0f} ms")
+    r = summary["restart"]
+    print(
+        f"restart (median of {args.runs}): import {r['import_ms']:.0f} ms ({r['modules_at_import']:.0f} modules), "
+        f"agent ready {r['ready_ms']:.0f} ms ({r['modules_at_ready']:.0f} modules)"
+    )
+
+    if args.top:
+        summary["slowest_imports"] = slowest_imports(db_path, args.top)
+        print("slowest imports under backend.main:")
+        for name, ms in summary["slowest_imports"]:
+            print(f"  {ms:8.1f} ms  {name}")
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump({"config": vars(args), **summary}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Compare LLM prompt tokens of the old pretty-printed JSON tool results
+against the compact table encoding, over queries on the sample catalog.
+Runs against a throwaway database.
+
+    python benchmarks/tool_tokens.py [--limit N] [--json out.json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+# Ensure project root is importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _token_counter():
+    """Use tiktoken's cl100k_base as a tokenizer proxy if installed, else ~4 chars/token."""
+    try:
+        import tiktoken
+    except ImportError:
+        return "chars/4", lambda text: max(1, len(text) // 4)
+    enc = tiktoken.get_encoding("cl100k_base")
+    return "cl100k_base", lambda text: len(enc.encode(text))
+
+
+def _queries(catalog):
+    """Every ticket type unfiltered, plus one query per distinct origin."""
+    for type_key in ("flights", "trains", "movies"):
+        rows = catalog.search(type_key)
+        yield type_key, "", rows
+        for origin in sorted({t["origin"] for t in rows}):
+            yield type_key, origin, catalog.search(type_key, origin)
+
+
+def main():
+    # The SQLite catalog seeds its tables on first use; keep that out of omnibook.db
+    os.environ["DATABASE_PATH"] = os.path.join(tempfile.mkdtemp(), "tool_tokens.db")
+    from config import RESULT_LIMIT
+    from catalog.store import get_catalog
+    from tools.result_format import format_tickets
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=RESULT_LIMIT, help="top-N cap for the compact format (0 = no cap)")
+    parser.add_argument("--json", dest="json_out", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    tokenizer, count = _token_counter()
+    catalog = get_catalog()
+    rows_out = []
+    totals = {"before": 0, "after": 0}
+
+    for type_key, origin, results in _queries(catalog):
+        before = count(json.dumps(results, indent=2))
+        after = count(format_tickets(results, limit=args.limit))
+        totals["before"] += before
+        totals["after"] += after
+        rows_out.append({"type": type_key, "origin": origin or "*", "results": len(results), "before": before, "after": after})
+
+    print(f"tokenizer: {tokenizer}")
+    print(f"{'type':<8} {'origin':<12} {'rows':>5} {'before':>8} {'after':>8} {'saved':>7}")
+    for r in rows_out:
+        saved = 1 - r["after"] / r["before"] if r["before"] else 0
+        print(f"{r['type']:<8} {r['origin']:<12} {r['results']:>5} {r['before']:>8} {r['after']:>8} {saved:>6.0%}")
+    overall = 1 - totals["after"] / totals["before"]
+    print(f"{'total':<27} {totals['before']:>8} {totals['after']:>8} {overall:>6.0%}")
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump({"tokenizer": tokenizer, "queries": rows_out, "totals": totals}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
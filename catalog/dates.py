@@ -0,0 +1,93 @@
+import re
+from datetime import date as _date, timedelta
+
+_ISO_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_RANGE_RE = re.compile(r"^(\d{4}-\d{2}-\d{2})\s*(?:to|until|till|through|-|–|\.\.)\s*(\d{4}-\d{2}-\d{2})$")
+
+# Named departure windows as (after, before) in HH:MM; night wraps past midnight
+TIME_WINDOWS = {
+    "early morning": ("00:00", "06:00"),
+    "morning": ("05:00", "12:00"),
+    "afternoon": ("12:00", "17:00"),
+    "evening": ("17:00", "21:00"),
+    "night": ("21:00", "05:00"),
+}
+
+
+def is_iso_date(text):
+    """Check if string matches YYYY-MM-DD format."""
+    return bool(_ISO_RE.match(text))
+
+
+def parse_date_range(text, end="", today=None):
+    """Turn a date or date phrase into an inclusive (start, end) YYYY-MM-DD pair.
+
+    Accepts YYYY-MM-DD, "YYYY-MM-DD to YYYY-MM-DD", or a phrase such as
+    today, tomorrow, this/next weekend, this/next week. `end` optionally
+    extends a single start date into a range. Returns None when `text`
+    isn't a recognised date, and ("", "") when both are empty.
+    """
+    text = " ".join(str(text or "").lower().split())
+    end = str(end or "").strip()
+    today = today or _date.today()
+
+    if not text:
+        return (end, end) if is_iso_date(end) else ("", "")
+    if is_iso_date(text):
+        return (text, end if is_iso_date(end) else text)
+
+    match = _RANGE_RE.match(text)
+    if match:
+        return match.group(1), match.group(2)
+
+    days_to_saturday = (5 - today.weekday()) % 7
+    phrases = {
+        "today": (today, today),
+        "tonight": (today, today),
+        "tomorrow": (today + timedelta(days=1), today + timedelta(days=1)),
+        "this weekend": (today + timedelta(days=days_to_saturday), today + timedelta(days=days_to_saturday + 1)),
+        "weekend": (today + timedelta(days=days_to_saturday), today + timedelta(days=days_to_saturday + 1)),
+        "next weekend": (today + timedelta(days=days_to_saturday + 7), today + timedelta(days=days_to_saturday + 8)),
+        "this week": (today, today + timedelta(days=6 - today.weekday())),
+        "next week": (
+            today + timedelta(days=7 - today.weekday()),
+            today + timedelta(days=13 - today.weekday()),
+        ),
+    }
+    if today.weekday() == 6:
+        # On Sunday, "this weekend" means today
+        phrases["this weekend"] = phrases["weekend"] = (today, today)
+    if text not in phrases:
+        return None
+    start, stop = phrases[text]
+    return start.isoformat(), stop.isoformat()
+
+
+def parse_time_window(after="", before=""):
+    """Normalize a departure window to (after, before) HH:MM strings.
+
+    Either bound may be empty; `after` may also be a named window such as
+    "morning" or "evening". Returns None if a bound isn't a valid time.
+    """
+    after = str(after or "").strip().lower()
+    before = str(before or "").strip().lower()
+    if after in TIME_WINDOWS and not before:
+        return TIME_WINDOWS[after]
+
+    bounds = []
+    for value in (after, before):
+        if not value:
+            bounds.append("")
+            continue
+        match = re.match(r"^(\d{1,2})(?::(\d{2}))?\s*(am|pm)?$", value)
+        if not match:
+            return None
+        hour, minute = int(match.group(1)), int(match.group(2) or 0)
+        if match.group(3) == "pm" and hour < 12:
+            hour += 12
+        elif match.group(3) == "am" and hour == 12:
+            hour = 0
+        if hour > 23 or minute > 59:
+            return None
+        bounds.append(f"{hour:02d}:{minute:02d}")
+    return bounds[0], bounds[1]
@@ -0,0 +1,100 @@
+import sqlite3
+import threading
+import time
+import uuid
+
+# Seat holds: selecting a ticket takes its seats out of seats_available for a
+# short time, so the seat can't be sold to someone else while the user enters
+# passenger details and confirms payment. Every seat change is a conditional
+# UPDATE (compare-and-swap on the remaining count), so concurrent sessions can
+# never oversell a ticket regardless of how their transactions interleave.
+
+
+def take_seats(conn, table, ticket_id, count):
+    """Decrement seats_available by `count` (at least 1) only if that many are still free."""
+    return conn.execute(
+        f"UPDATE {table} SET seats_available = seats_available - ? WHERE id = ? AND ? > 0 AND seats_available >= ?",
+        (count, ticket_id, count, count),
+    ).rowcount == 1
+
+
+def return_seats(conn, released):
+    """Add the seats of released holds [(table, ticket_id, seats)] back to their tickets."""
+    totals = {}
+    for table, ticket_id, seats in released:
+        totals.setdefault(table, {}).setdefault(ticket_id, 0)
+        totals[table][ticket_id] += seats
+    for table, seats_by_id in totals.items():
+        conn.executemany(
+            f"UPDATE {table} SET seats_available = seats_available + ? WHERE id = ?",
+            [(seats, ticket_id) for ticket_id, seats in seats_by_id.items()],
+        )
+
+
+def place_hold(conn, table, ticket_id, seats, ttl, now=None):
+    """Take `seats` seats and record a hold on them; returns the hold, or None if sold out."""
+    if not take_seats(conn, table, ticket_id, seats):
+        return None
+    now = time.time() if now is None else now
+    hold_id = f"HOLD-{uuid.uuid4().hex[:12].upper()}"
+    conn.execute(
+        "INSERT INTO seat_holds (hold_id, ticket_type, ticket_id, seats, expires_at, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+        (hold_id, table, ticket_id, seats, now + ttl, now),
+    )
+    return {"hold_id": hold_id, "ticket_id": ticket_id, "seats": seats, "expires_at": now + ttl}
+
+
+def claim_hold(conn, hold_id, table, ticket_id, now=None):
+    """Consume a live hold on this ticket and return its seat count (0 if missing or expired)."""
+    row = conn.execute(
+        "DELETE FROM seat_holds WHERE hold_id = ? AND ticket_type = ? AND ticket_id = ? AND expires_at > ? RETURNING seats",
+        (hold_id, table, ticket_id, time.time() if now is None else now),
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def release_hold(conn, hold_id):
+    """Cancel a hold and give its seats back; returns False if it no longer exists."""
+    released = conn.execute(
+        "DELETE FROM seat_holds WHERE hold_id = ? RETURNING ticket_type, ticket_id, seats", (hold_id,)
+    ).fetchall()
+    return_seats(conn, released)
+    return bool(released)
+
+
+def release_expired(conn, now=None, table=None, ticket_id=None):
+    """Give back the seats of expired holds (optionally for one ticket); returns how many were released."""
+    sql = "DELETE FROM seat_holds WHERE expires_at <= ?"
+    params = [time.time() if now is None else now]
+    if table is not None:
+        sql += " AND ticket_type = ? AND ticket_id = ?"
+        params += [table, ticket_id]
+    released = conn.execute(sql + " RETURNING ticket_type, ticket_id, seats", params).fetchall()
+    return_seats(conn, released)
+    return len(released)
+
+
+class HoldSweeper:
+    """Daemon thread that calls `sweep()` every `interval` seconds to expire holds."""
+
+    def __init__(self, sweep, interval):
+        self.sweep = sweep
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="omnibook-hold-sweeper", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep()
+            except sqlite3.Error:
+                # Locked or busy database: the next tick retries
+                pass
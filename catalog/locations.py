@@ -0,0 +1,92 @@
+# Alternate and historical spellings -> canonical catalog city names
+CITY_ALIASES = {
+    "bangalore": "Bengaluru",
+    "bengaluru city": "Bengaluru",
+    "bombay": "Mumbai",
+    "calcutta": "Kolkata",
+    "madras": "Chennai",
+    "new delhi": "Delhi",
+    "delhi ncr": "Delhi",
+    "mysore": "Mysuru",
+    "cochin": "Kochi",
+    "ernakulam": "Kochi",
+    "poona": "Pune",
+    "banaras": "Varanasi",
+    "benares": "Varanasi",
+    "kashi": "Varanasi",
+    "amdavad": "Ahmedabad",
+    "panaji": "Goa",
+    "secunderabad": "Hyderabad",
+}
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _edit_distance(a, b, limit):
+    """Edit distance counting adjacent transpositions as one edit.
+
+    Returns limit + 1 as soon as the distance is known to exceed `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if before is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+class LocationResolver:
+    """Resolves messy city input to canonical catalog names.
+
+    Exact names and aliases are a single dict lookup; misspellings go
+    through a trigram index that narrows candidates before an
+    edit-distance check.
+    """
+
+    def __init__(self, cities, aliases=CITY_ALIASES):
+        canonical = {c.strip().lower(): c for c in cities}
+        self.names = dict(canonical)
+        for alias, target in aliases.items():
+            if target.lower() in canonical:
+                self.names.setdefault(alias, canonical[target.lower()])
+
+        self._trigram_index = {}
+        for key in self.names:
+            for gram in _trigrams(key):
+                self._trigram_index.setdefault(gram, set()).add(key)
+
+    def resolve(self, text):
+        """Return the canonical city for `text`, or None if nothing is close enough."""
+        key = " ".join(str(text or "").lower().split())
+        if not key:
+            return None
+        if key in self.names:
+            return self.names[key]
+
+        grams = _trigrams(key)
+        shared = {}
+        for gram in grams:
+            for candidate in self._trigram_index.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+
+        limit = max(1, len(key) // 4)
+        best = None
+        for candidate, count in sorted(shared.items(), key=lambda kv: -kv[1]):
+            if count * 3 < len(grams):
+                break
+            distance = _edit_distance(key, candidate, limit)
+            if distance <= limit and (best is None or distance < best[0]):
+                best = (distance, candidate)
+        return self.names[best[1]] if best else None
@@ -0,0 +1,294 @@
+import json
+import os
+import sys
+import threading
+import time
+from config import SEAT_HOLD_SWEEP_INTERVAL, SEAT_HOLD_TTL, TICKETS_PATH
+from catalog.holds import HoldSweeper, claim_hold, place_hold, release_expired, release_hold, return_seats, take_seats
+from catalog.locations import LocationResolver
+from catalog.store import CatalogBackend, SORT_KEYS, SoldOutError, _duration, _minutes, _normalize, check_seat_count
+from database.db import connection, init_db
+
+# One table per ticket type, created by migration 5
+TICKET_TABLES = ("flights", "trains", "movies")
+
+_ORDER_BY = {
+    "relevance": "rowid",
+    "price": "price, rowid",
+    "departure": "departure_min IS NULL, departure_min, rowid",
+    "duration": "duration_min IS NULL, duration_min, rowid",
+}
+_INSERT_TICKET = """INSERT INTO {table} (
+        id, origin_key, destination_key, date, departure_min, duration_min,
+        price, class_key, genre_key, seats_available, data
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+_CITY_REFRESH_SECONDS = 60
+
+
+def _ticket_row(row):
+    """Flatten one JSON ticket into the indexed columns of its table."""
+    return (
+        str(row["id"]),
+        _normalize(row.get("origin")),
+        _normalize(row.get("destination")),
+        _normalize(row.get("date")) or None,
+        _minutes(row.get("departure") or row.get("showtime")),
+        _duration(row),
+        row.get("price", 0),
+        _normalize(row.get("class")) or None,
+        _normalize(row.get("genre")) or None,
+        row.get("seats_available"),
+        json.dumps(row),
+    )
+
+
+def _table_for(ticket_type):
+    """Map 'flight' / 'Flights' to its table name, or None for unknown types."""
+    table = str(ticket_type or "").strip().lower().rstrip("s") + "s"
+    return table if table in TICKET_TABLES else None
+
+
+def import_tickets(path=TICKETS_PATH):
+    """Replace the inventory of every ticket type in the JSON file and return row counts.
+
+    Each type is cleared, along with its open seat holds, and bulk-inserted
+    with executemany, all in one transaction, so readers see either the old
+    or the new inventory.
+    """
+    init_db()
+    with open(path, "r") as f:
+        data = json.load(f)
+
+    counts = {}
+    with connection() as conn:
+        for table, rows in data.items():
+            if table not in TICKET_TABLES:
+                continue
+            conn.execute(f"DELETE FROM {table}")
+            # Open holds refer to the old counts; releasing them later would oversell
+            conn.execute("DELETE FROM seat_holds WHERE ticket_type = ?", (table,))
+            conn.executemany(_INSERT_TICKET.format(table=table), (_ticket_row(r) for r in rows))
+            counts[table] = len(rows)
+    return counts
+
+
+class SQLiteTicketCatalog(CatalogBackend):
+    """Ticket inventory stored in SQLite tables and searched with indexed queries.
+
+    Seat counts are live: holds set seats aside while a user checks out,
+    bookings decrement them in the booking transaction, and a background
+    sweeper returns the seats of expired holds. The tables are filled from
+    the JSON file on first use if they are empty; afterwards the database
+    is the source of truth.
+    """
+
+    def __init__(self, seed_path=TICKETS_PATH):
+        self.seed_path = seed_path
+        self._lock = threading.Lock()
+        self._ready = False
+        self._resolver = LocationResolver([])
+        self._cities_loaded_at = 0.0
+        self._sweeper = HoldSweeper(self.release_expired_holds, SEAT_HOLD_SWEEP_INTERVAL)
+
+    def _ensure_ready(self):
+        if self._ready:
+            return
+        with self._lock:
+            if self._ready:
+                return
+            init_db()
+            with connection() as conn:
+                empty = all(
+                    conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() is None
+                    for table in TICKET_TABLES
+                )
+            if empty and self.seed_path and os.path.exists(self.seed_path):
+                import_tickets(self.seed_path)
+            self._sweeper.start()
+            self._ready = True
+
+    def _ensure_cities(self):
+        """Rebuild the city resolver from the tables at most once per refresh interval."""
+        self._ensure_ready()
+        if time.monotonic() - self._cities_loaded_at < _CITY_REFRESH_SECONDS:
+            return
+        with self._lock:
+            if time.monotonic() - self._cities_loaded_at < _CITY_REFRESH_SECONDS:
+                return
+            cities = set()
+            with connection() as conn:
+                for table in TICKET_TABLES:
+                    for field, column in (("origin", "origin_key"), ("destination", "destination_key")):
+                        rows = conn.execute(
+                            f"SELECT json_extract(data, '$.{field}') FROM {table} "
+                            f"WHERE {column} != '' GROUP BY {column}"
+                        ).fetchall()
+                        cities.update(r[0] for r in rows if r[0])
+            self._resolver = LocationResolver(cities)
+            self._cities_loaded_at = time.monotonic()
+
+    def has_type(self, type_key):
+        return type_key in TICKET_TABLES
+
+    def city_names(self):
+        self._ensure_cities()
+        return self._resolver.names
+
+    def resolve_city(self, text):
+        self._ensure_cities()
+        return self._resolver.resolve(text)
+
+    def dates(self, type_key):
+        if type_key not in TICKET_TABLES:
+            return []
+        self._ensure_ready()
+        with connection() as conn:
+            rows = conn.execute(
+                f"SELECT DISTINCT date FROM {type_key} WHERE date IS NOT NULL ORDER BY date"
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def get_ticket(self, ticket_id):
+        self._ensure_ready()
+        with connection() as conn:
+            for table in TICKET_TABLES:
+                row = conn.execute(
+                    f"SELECT data, seats_available FROM {table} WHERE id = ?", (str(ticket_id).strip(),)
+                ).fetchone()
+                if row:
+                    ticket = json.loads(row[0])
+                    if row[1] is not None:
+                        ticket["seats_available"] = row[1]
+                    return table, ticket
+        return None
+
+    @staticmethod
+    def _match(conn, table, column, term, where, params):
+        """Exact match on an indexed key column, falling back to substring match."""
+        if conn.execute(f"SELECT 1 FROM {table} WHERE {column} = ? LIMIT 1", (term,)).fetchone():
+            where.append(f"{column} = ?")
+        else:
+            where.append(f"instr({column}, ?) > 0")
+        params.append(term)
+
+    def query(
+        self, type_key, origin="", destination="", offset=0, limit=None, date_from="", date_to="",
+        depart_after="", depart_before="", min_price=None, max_price=None, travel_class="", genre="",
+        min_seats=None, sort_by="relevance",
+    ):
+        if type_key not in TICKET_TABLES:
+            return [], 0
+        self._ensure_ready()
+
+        where, params = [], []
+        with connection() as conn:
+            for column, term in (
+                ("origin_key", _normalize(origin)),
+                ("destination_key", _normalize(destination)),
+                ("class_key", _normalize(travel_class)),
+                ("genre_key", _normalize(genre)),
+            ):
+                if term:
+                    self._match(conn, type_key, column, term, where, params)
+
+            date_from, date_to = _normalize(date_from), _normalize(date_to)
+            if date_from:
+                where.append("date >= ?")
+                params.append(date_from)
+            if date_to:
+                where.append("date <= ?")
+                params.append(date_to)
+
+            after, before = _minutes(depart_after), _minutes(depart_before)
+            if after is not None and before is not None and after > before:
+                where.append("(departure_min >= ? OR departure_min <= ?)")
+                params += [after, before]
+            else:
+                if after is not None:
+                    where.append("departure_min >= ?")
+                    params.append(after)
+                if before is not None:
+                    where.append("departure_min <= ?")
+                    params.append(before)
+
+            if min_price is not None:
+                where.append("price >= ?")
+                params.append(min_price)
+            if max_price is not None:
+                where.append("price <= ?")
+                params.append(max_price)
+            if min_seats:
+                where.append("seats_available >= ?")
+                params.append(min_seats)
+
+            clause = f"WHERE {' AND '.join(where)}" if where else ""
+            order = _ORDER_BY.get(sort_by if sort_by in SORT_KEYS else "relevance")
+            rows = conn.execute(
+                f"SELECT data, seats_available FROM {type_key} {clause} ORDER BY {order} LIMIT ? OFFSET ?",
+                params + [-1 if limit is None else limit, offset],
+            ).fetchall()
+            if limit is None and not offset:
+                total = len(rows)
+            else:
+                total = conn.execute(f"SELECT COUNT(*) FROM {type_key} {clause}", params).fetchone()[0]
+
+        results = []
+        for data, seats in rows:
+            ticket = json.loads(data)
+            if seats is not None:
+                ticket["seats_available"] = seats
+            results.append(ticket)
+        return results, total
+
+    @staticmethod
+    def _table(ticket_type):
+        table = _table_for(ticket_type)
+        if table is None:
+            raise ValueError(f"Unknown ticket type '{ticket_type}'.")
+        return table
+
+    @staticmethod
+    def _sold_out(conn, table, ticket_id, count):
+        if conn.execute(f"SELECT 1 FROM {table} WHERE id = ?", (ticket_id,)).fetchone() is None:
+            return ValueError(f"Unknown {table[:-1]} ticket '{ticket_id}'.")
+        return SoldOutError(f"Ticket {ticket_id} does not have {count} seat(s) left.")
+
+    def hold_seats(self, ticket_type, ticket_id, seats=1, ttl=SEAT_HOLD_TTL):
+        check_seat_count(seats)
+        table = self._table(ticket_type)
+        self._ensure_ready()
+        with connection() as conn:
+            # Expired holds on this ticket go back first, without waiting for the sweeper
+            release_expired(conn, table=table, ticket_id=ticket_id)
+            hold = place_hold(conn, table, ticket_id, seats, ttl)
+            if hold is None:
+                raise self._sold_out(conn, table, ticket_id, seats)
+        return hold
+
+    def release_hold(self, hold_id):
+        self._ensure_ready()
+        with connection() as conn:
+            return release_hold(conn, hold_id)
+
+    def release_expired_holds(self):
+        """Return the seats of every expired hold; returns how many holds were released."""
+        with connection() as conn:
+            return release_expired(conn)
+
+    def decrement_seats(self, conn, ticket_type, ticket_id, count=1, hold_id=""):
+        check_seat_count(count)
+        table = self._table(ticket_type)
+        self._ensure_ready()
+        held = claim_hold(conn, hold_id, table, ticket_id) if hold_id else 0
+        if held > count:
+            return_seats(conn, [(table, ticket_id, held - count)])
+        elif held < count:
+            release_expired(conn, table=table, ticket_id=ticket_id)
+            if not take_seats(conn, table, ticket_id, count - held):
+                raise self._sold_out(conn, table, ticket_id, count)
+
+
+if __name__ == "__main__":
+    # python -m catalog.sqlite_store [path/to/tickets.json]
+    for table, count in import_tickets(sys.argv[1] if len(sys.argv) > 1 else TICKETS_PATH).items():
+        print(f"{table}: {count} rows")
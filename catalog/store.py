@@ -0,0 +1,373 @@
+import bisect
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from config import CATALOG_BACKEND, TICKETS_PATH
+from catalog.locations import LocationResolver
+
+
+def _normalize(value):
+    """Normalize a lookup key (city, date) for index matching."""
+    return str(value or "").strip().lower()
+
+
+SORT_KEYS = ("relevance", "price", "departure", "duration")
+
+
+def _minutes(hhmm):
+    """Minutes since midnight for an HH:MM string, or None."""
+    try:
+        hours, minutes = str(hhmm).split(":")
+        return int(hours) * 60 + int(minutes)
+    except (TypeError, ValueError):
+        return None
+
+
+def _duration(row):
+    departure, arrival = _minutes(row.get("departure")), _minutes(row.get("arrival"))
+    if departure is None or arrival is None:
+        return None
+    return (arrival - departure) % (24 * 60)
+
+
+class _SortedKey:
+    """Row positions ordered by one key, for bisect range lookups and sorting."""
+
+    def __init__(self, values):
+        self.values = values
+        self.order = sorted((i for i, v in enumerate(values) if v is not None), key=values.__getitem__)
+        self.keys = [values[i] for i in self.order]
+        # Rows without this key sort last
+        self.rank = [len(values)] * len(values)
+        for rank, pos in enumerate(self.order):
+            self.rank[pos] = rank
+
+    def span(self, lo=None, hi=None):
+        start = 0 if lo is None else bisect.bisect_left(self.keys, lo)
+        end = len(self.keys) if hi is None else bisect.bisect_right(self.keys, hi)
+        return start, max(start, end)
+
+
+class _Filter:
+    """One query condition: its match count, matching positions, and a per-row test."""
+
+    def __init__(self, size, positions, accepts, found=None):
+        self.size = size
+        self.positions = positions
+        self.accepts = accepts
+        self.found = found
+
+
+def _set_filter(found):
+    return _Filter(len(found), lambda: found, found.__contains__, found)
+
+
+def _range_filter(key, lo=None, hi=None):
+    start, end = key.span(lo, hi)
+    values = key.values
+
+    def accepts(i):
+        v = values[i]
+        return v is not None and (lo is None or v >= lo) and (hi is None or v <= hi)
+
+    return _Filter(end - start, lambda: key.order[start:end], accepts)
+
+
+def _wrapped_range_filter(key, lo, hi):
+    """Range that wraps around (e.g. departures after 21:00 or before 05:00)."""
+    late, early = key.span(lo, None), key.span(None, hi)
+    values = key.values
+
+    def accepts(i):
+        v = values[i]
+        return v is not None and (v >= lo or v <= hi)
+
+    return _Filter(
+        (late[1] - late[0]) + (early[1] - early[0]),
+        lambda: key.order[early[0]:early[1]] + key.order[late[0]:late[1]],
+        accepts,
+    )
+
+
+class _TypeIndex:
+    """Hash indexes and sorted key arrays over one ticket type."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.by_id = {}
+        self.by_origin = {}
+        self.by_destination = {}
+        self.by_date = {}
+        self.by_category = {"class": {}, "genre": {}}
+        self.city_names = {}
+
+        for pos, row in enumerate(rows):
+            self.by_id[str(row.get("id"))] = pos
+            self.by_origin.setdefault(_normalize(row.get("origin")), []).append(pos)
+            self.by_destination.setdefault(_normalize(row.get("destination")), []).append(pos)
+            self.by_date.setdefault(_normalize(row.get("date")), []).append(pos)
+            for field, index in self.by_category.items():
+                if row.get(field):
+                    index.setdefault(_normalize(row[field]), []).append(pos)
+            for field in ("origin", "destination"):
+                if row.get(field):
+                    self.city_names.setdefault(_normalize(row[field]), row[field])
+
+        # Frozen buckets can be handed out without copying
+        for index in (self.by_origin, self.by_destination, self.by_date, *self.by_category.values()):
+            for key, positions in index.items():
+                index[key] = frozenset(positions)
+
+        self.sorted_keys = {
+            "price": _SortedKey([row.get("price", 0) for row in rows]),
+            "date": _SortedKey([_normalize(row.get("date")) or None for row in rows]),
+            "departure": _SortedKey([_minutes(row.get("departure") or row.get("showtime")) for row in rows]),
+            "duration": _SortedKey([_duration(row) for row in rows]),
+            "seats": _SortedKey([row.get("seats_available") for row in rows]),
+        }
+
+    @staticmethod
+    def _lookup(index, term):
+        """Positions whose key equals `term`, or contains it as a substring."""
+        if term in index:
+            return index[term]
+        positions = set()
+        for key, rows in index.items():
+            if term in key:
+                positions.update(rows)
+        return positions
+
+    def query(
+        self, origin="", destination="", date_from="", date_to="", depart_after="", depart_before="",
+        min_price=None, max_price=None, travel_class="", genre="", min_seats=None, sort_by="relevance",
+    ):
+        """Return matching rows, sorted by `sort_by` (relevance = catalog order).
+
+        Each condition knows its match count up front (hash bucket size or
+        bisect span), so only the most selective one is materialized and the
+        rest are checked per candidate row.
+        """
+        filters = []
+        for index, term in (
+            (self.by_origin, _normalize(origin)),
+            (self.by_destination, _normalize(destination)),
+            (self.by_category["class"], _normalize(travel_class)),
+            (self.by_category["genre"], _normalize(genre)),
+        ):
+            if term:
+                filters.append(_set_filter(self._lookup(index, term)))
+
+        date_from, date_to = _normalize(date_from), _normalize(date_to)
+        if date_from or date_to:
+            filters.append(_range_filter(self.sorted_keys["date"], date_from or None, date_to or None))
+
+        after, before = _minutes(depart_after), _minutes(depart_before)
+        if after is not None and before is not None and after > before:
+            filters.append(_wrapped_range_filter(self.sorted_keys["departure"], after, before))
+        elif after is not None or before is not None:
+            filters.append(_range_filter(self.sorted_keys["departure"], after, before))
+
+        if min_price is not None or max_price is not None:
+            filters.append(_range_filter(self.sorted_keys["price"], min_price, max_price))
+        if min_seats:
+            filters.append(_range_filter(self.sorted_keys["seats"], min_seats, None))
+
+        # Intersect hash-bucket conditions in C before scanning candidates
+        set_filters = [f for f in filters if f.found is not None]
+        if len(set_filters) > 1:
+            found = frozenset.intersection(*(frozenset(f.found) for f in set_filters))
+            filters = [f for f in filters if f.found is None] + [_set_filter(found)]
+
+        if not filters:
+            matches = list(range(len(self.rows)))
+        else:
+            filters.sort(key=lambda f: f.size)
+            seed, rest = filters[0], filters[1:]
+            if seed.size == 0:
+                return []
+            matches = [i for i in seed.positions() if all(f.accepts(i) for f in rest)]
+
+        if sort_by in SORT_KEYS and sort_by != "relevance":
+            matches.sort(key=self.sorted_keys[sort_by].rank.__getitem__)
+        else:
+            matches.sort()
+        return [self.rows[i] for i in matches]
+
+
+class SoldOutError(Exception):
+    """Raised when a booking asks for more seats than a ticket has left."""
+
+
+def check_seat_count(seats):
+    """Raise ValueError unless `seats` is a whole number of at least one seat."""
+    if isinstance(seats, bool) or not isinstance(seats, int) or seats < 1:
+        raise ValueError(f"Number of seats must be a whole number of at least 1, got {seats!r}.")
+
+
+class CatalogBackend(ABC):
+    """Ticket inventory interface shared by the JSON and SQLite catalogs."""
+
+    @abstractmethod
+    def has_type(self, type_key):
+        """Return True if the catalog holds tickets of `type_key` (e.g. 'flights')."""
+
+    @abstractmethod
+    def city_names(self):
+        """Return {normalized name or alias: canonical city} for every known city."""
+
+    @abstractmethod
+    def resolve_city(self, text):
+        """Map a city name, alias or misspelling to its canonical catalog name (or None)."""
+
+    @abstractmethod
+    def dates(self, type_key):
+        """Return the sorted distinct dates that have tickets of `type_key`."""
+
+    @abstractmethod
+    def query(self, type_key, origin="", destination="", offset=0, limit=None, **filters):
+        """Run a multi-criteria search and return (page of rows, total matches).
+
+        Filters: date_from/date_to (inclusive YYYY-MM-DD), depart_after/
+        depart_before (HH:MM, wrapping past midnight if after > before),
+        min_price/max_price, travel_class, genre (substring match) and
+        min_seats. sort_by is one of SORT_KEYS.
+        """
+
+    @abstractmethod
+    def get_ticket(self, ticket_id):
+        """Return (type_key, ticket) for a ticket id, or None if no type has it."""
+
+    def search(self, type_key, origin="", destination="", date="", max_price=None):
+        """Return tickets of `type_key` matching the given filters, in catalog order.
+
+        Origin and destination match case-insensitively (exact city first,
+        substring fallback); date matches exactly; max_price is inclusive.
+        """
+        return self.query(type_key, origin, destination, date_from=date, date_to=date, max_price=max_price)[0]
+
+    def hold_seats(self, ticket_type, ticket_id, seats=1):
+        """Set `seats` seats of a ticket aside for a short time while the user checks out.
+
+        Returns the hold as {hold_id, ticket_id, seats, expires_at}; raises
+        SoldOutError if not enough seats are left. Read-only catalogs can't
+        hold seats and return a hold with an empty hold_id.
+        """
+        check_seat_count(seats)
+        return {"hold_id": "", "ticket_id": ticket_id, "seats": seats, "expires_at": None}
+
+    def release_hold(self, hold_id):
+        """Cancel a hold and return its seats; returns False if it no longer exists."""
+        return False
+
+    def decrement_seats(self, conn, ticket_type, ticket_id, count=1, hold_id=""):
+        """Take `count` seats of a ticket inside the caller's booking transaction.
+
+        Seats already set aside by a live `hold_id` are used first. Raises
+        SoldOutError if not enough seats are left. Read-only catalogs leave
+        seat counts untouched.
+        """
+        check_seat_count(count)
+
+
+class TicketCatalog(CatalogBackend):
+    """Ticket inventory loaded once from JSON and reloaded when the file changes."""
+
+    def __init__(self, path=TICKETS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._indexes = {}
+        self._resolver = LocationResolver([])
+
+    def _ensure_loaded(self):
+        """Rebuild the indexes if the backing file's mtime has changed."""
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            indexes = {key: _TypeIndex(rows) for key, rows in data.items()}
+            cities = {name for index in indexes.values() for name in index.city_names.values()}
+            self._indexes = indexes
+            self._resolver = LocationResolver(cities)
+            self._mtime = mtime
+
+    def has_type(self, type_key):
+        self._ensure_loaded()
+        return type_key in self._indexes
+
+    def city_names(self):
+        self._ensure_loaded()
+        return self._resolver.names
+
+    def resolve_city(self, text):
+        self._ensure_loaded()
+        return self._resolver.resolve(text)
+
+    def dates(self, type_key):
+        self._ensure_loaded()
+        index = self._indexes.get(type_key)
+        return sorted(d for d in index.by_date if d) if index else []
+
+    def get_ticket(self, ticket_id):
+        self._ensure_loaded()
+        for type_key, index in self._indexes.items():
+            pos = index.by_id.get(str(ticket_id).strip())
+            if pos is not None:
+                return type_key, index.rows[pos]
+        return None
+
+    def query(self, type_key, origin="", destination="", offset=0, limit=None, **filters):
+        self._ensure_loaded()
+        index = self._indexes.get(type_key)
+        if index is None:
+            return [], 0
+        rows = index.query(origin, destination, **filters)
+        end = None if limit is None else offset + limit
+        return rows[offset:end], len(rows)
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+# Placeholders the agent passes for "no city" (e.g. destination for movies)
+_NO_CITY = {"n/a", "na", "none", "any", "-"}
+
+
+def resolve_route(catalog, origin="", destination=""):
+    """Resolve origin/destination to canonical city names.
+
+    Returns (origin, destination, note); unresolvable input is passed
+    through unchanged, and `note` lists any names that were rewritten.
+    """
+    resolved = []
+    changes = []
+    for text in (origin, destination):
+        if text.strip().lower() in _NO_CITY:
+            text = ""
+        name = catalog.resolve_city(text) if text else None
+        if name and name.lower() != text.strip().lower():
+            changes.append(f"'{text}' -> '{name}'")
+        resolved.append(name or text)
+    note = f"(Matched city names: {', '.join(changes)})" if changes else ""
+    return resolved[0], resolved[1], note
+
+
+def get_catalog():
+    """Return the shared process-wide ticket catalog selected by CATALOG_BACKEND."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                if CATALOG_BACKEND == "sqlite":
+                    from catalog.sqlite_store import SQLiteTicketCatalog
+                    _catalog = SQLiteTicketCatalog()
+                elif CATALOG_BACKEND == "json":
+                    _catalog = TicketCatalog()
+                else:
+                    raise ValueError(f"Unknown CATALOG_BACKEND '{CATALOG_BACKEND}'. Choose from: sqlite, json.")
+    return _catalog
@@ -8,7 +8,34 @@ PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
 MODEL_NAME = os.getenv("MODEL_NAME", "llama-3.3-70b-versatile")
 DATABASE_PATH = os.getenv("DATABASE_PATH", os.path.join(PROJECT_ROOT, "omnibook.db"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
 TICKETS_PATH = os.path.join(PROJECT_ROOT, "data", "tickets.json")
+CATALOG_BACKEND = os.getenv("CATALOG_BACKEND", "sqlite")
+SEAT_HOLD_TTL = float(os.getenv("SEAT_HOLD_TTL", "600"))
+SEAT_HOLD_SWEEP_INTERVAL = float(os.getenv("SEAT_HOLD_SWEEP_INTERVAL", "30"))
+GROUP_BOOKING_MAX = int(os.getenv("GROUP_BOOKING_MAX", "10"))
+RESULT_LIMIT = int(os.getenv("RESULT_LIMIT", "10"))
 SMTP_EMAIL = os.getenv("SMTP_EMAIL", "")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1").lower() not in ("0", "false", "no")
+SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", "60"))
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "20"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "6"))
+EMAIL_RETRY_BASE = float(os.getenv("EMAIL_RETRY_BASE", "30"))
+EMAIL_POLL_INTERVAL = float(os.getenv("EMAIL_POLL_INTERVAL", "5"))
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
+IO_WORKERS = int(os.getenv("IO_WORKERS", "8"))
+TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", "30"))
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "sqlite")
+SESSION_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "256"))
+SESSION_CACHE_MAX_BYTES = int(os.getenv("SESSION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "900"))
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "6000"))
+FAST_PATH_ROUTER = os.getenv("FAST_PATH_ROUTER", "1").lower() not in ("0", "false", "no")
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+LLM_CACHE_MAX_ROWS = int(os.getenv("LLM_CACHE_MAX_ROWS", "20000"))
@@ -1,134 +1,532 @@
+import functools
+import queue
 import sqlite3
-from config import DATABASE_PATH
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from config import DATABASE_PATH, DB_POOL_SIZE, DB_BUSY_TIMEOUT_MS
+from database.migrations import run_migrations
+from monitoring.metrics import DB_CALL_SECONDS, DB_CONNECTION_SECONDS
 
 
 def get_connection():
-    """Get a database connection with row factory enabled."""
-    conn = sqlite3.connect(DATABASE_PATH)
+    """Open a tuned database connection with row factory enabled.
+
+    WAL lets readers run alongside a writer, synchronous=NORMAL drops the
+    per-commit fsync of the WAL (still durable across app crashes), and
+    busy_timeout makes concurrent writers wait instead of failing with
+    "database is locked". Statements are cached per connection, so pooled
+    connections reuse their prepared statements.
+    """
+    conn = sqlite3.connect(
+        DATABASE_PATH,
+        timeout=DB_BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=False,
+        cached_statements=256,
+    )
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={int(DB_BUSY_TIMEOUT_MS)}")
     return conn
 
 
+class ConnectionPool:
+    """Thread-safe pool of reusable SQLite connections.
+
+    Keeps up to `size` idle connections; extra connections opened under
+    bursts are closed when released instead of being pooled.
+    """
+
+    def __init__(self, size=DB_POOL_SIZE):
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return get_connection()
+
+    def release(self, conn):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_pool = ConnectionPool()
+
+
+@contextmanager
+def connection():
+    """Borrow a pooled connection; commit on success, roll back on error."""
+    conn = _pool.acquire()
+    started = time.perf_counter()
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        _pool.release(conn)
+        DB_CONNECTION_SECONDS.observe(time.perf_counter() - started)
+
+
+def _timed(func):
+    """Record each call's latency under the function's name."""
+    operation = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with DB_CALL_SECONDS.time(operation=operation):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+@_timed
 def init_db():
-    """Create all tables if they don't exist."""
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            email TEXT NOT NULL,
-            phone TEXT NOT NULL,
-            age INTEGER,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS bookings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            ticket_type TEXT NOT NULL,
-            ticket_id TEXT NOT NULL,
-            origin TEXT,
-            destination TEXT,
-            date TEXT,
-            price REAL NOT NULL,
-            transaction_id TEXT NOT NULL,
-            status TEXT DEFAULT 'confirmed',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        )
-    """)
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS payments (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            booking_id INTEGER NOT NULL,
-            amount REAL NOT NULL,
-            transaction_id TEXT NOT NULL,
-            status TEXT DEFAULT 'completed',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (booking_id) REFERENCES bookings(id)
-        )
-    """)
+    """Create all tables if they don't exist, then apply pending migrations."""
+    with connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                email TEXT NOT NULL,
+                phone TEXT NOT NULL,
+                age INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS bookings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                ticket_type TEXT NOT NULL,
+                ticket_id TEXT NOT NULL,
+                origin TEXT,
+                destination TEXT,
+                date TEXT,
+                price REAL NOT NULL,
+                transaction_id TEXT NOT NULL,
+                status TEXT DEFAULT 'confirmed',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(id)
+            )
+        """)
 
-    conn.commit()
-    conn.close()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS payments (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                booking_id INTEGER NOT NULL,
+                amount REAL NOT NULL,
+                transaction_id TEXT NOT NULL,
+                status TEXT DEFAULT 'completed',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (booking_id) REFERENCES bookings(id)
+            )
+        """)
 
+    with connection() as conn:
+        run_migrations(conn)
 
+
+_UPSERT_USER = """INSERT INTO users (name, email, phone, age) VALUES (?, ?, ?, ?)
+    ON CONFLICT (email) DO UPDATE SET name = excluded.name, phone = excluded.phone, age = excluded.age
+    RETURNING id"""
+_INSERT_BOOKING = """INSERT INTO bookings
+    (user_id, ticket_type, ticket_id, origin, destination, date, price, transaction_id, passenger_name, passenger_age)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+_INSERT_PAYMENT = "INSERT INTO payments (booking_id, amount, transaction_id, status) VALUES (?, ?, ?, ?)"
+_SELECT_RECEIPT = """
+    SELECT
+        b.id as booking_id, b.ticket_type, b.ticket_id, b.origin, b.destination,
+        b.date, b.price, b.transaction_id, b.status, b.created_at,
+        b.passenger_name, u.email, u.phone, b.passenger_age as age,
+        p.amount as payment_amount, p.status as payment_status
+    FROM bookings b
+    JOIN users u ON b.user_id = u.id
+    LEFT JOIN payments p ON p.booking_id = b.id
+    WHERE b.id = ?
+"""
+_SELECT_RECEIPTS_IN = _SELECT_RECEIPT.replace("WHERE b.id = ?", "WHERE b.id IN ({}) ORDER BY b.id")
+
+# Receipt rows of recently created bookings, so the receipt and email
+# tools that follow a booking don't re-run the join.
+_RECENT_RECEIPTS_MAX = 256
+_recent_receipts = OrderedDict()
+_recent_lock = threading.Lock()
+
+
+def _remember_receipt(receipt):
+    with _recent_lock:
+        _recent_receipts[receipt["booking_id"]] = receipt
+        _recent_receipts.move_to_end(receipt["booking_id"])
+        while len(_recent_receipts) > _RECENT_RECEIPTS_MAX:
+            _recent_receipts.popitem(last=False)
+
+
+@_timed
 def save_user(name, email, phone, age=None):
-    """Insert a new user and return the user_id."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO users (name, email, phone, age) VALUES (?, ?, ?, ?)",
-        (name, email, phone, age),
-    )
-    conn.commit()
-    user_id = cursor.lastrowid
-    conn.close()
-    return user_id
+    """Insert or update the user with this email and return the user_id."""
+    with connection() as conn:
+        return conn.execute(_UPSERT_USER, (name, email, phone, age)).fetchone()[0]
 
 
+@_timed
 def save_booking(user_id, ticket_type, ticket_id, origin, destination, date, price, transaction_id):
-    """Insert a new booking and return the booking_id."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        """INSERT INTO bookings (user_id, ticket_type, ticket_id, origin, destination, date, price, transaction_id)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-        (user_id, ticket_type, ticket_id, origin, destination, date, price, transaction_id),
-    )
-    conn.commit()
-    booking_id = cursor.lastrowid
-    conn.close()
-    return booking_id
+    """Insert a new booking for the user's current name and age and return the booking_id."""
+    with connection() as conn:
+        name, age = conn.execute("SELECT name, age FROM users WHERE id = ?", (user_id,)).fetchone()
+        return conn.execute(
+            _INSERT_BOOKING,
+            (user_id, ticket_type, ticket_id, origin, destination, date, price, transaction_id, name, age),
+        ).lastrowid
 
 
+@_timed
 def save_payment(booking_id, amount, transaction_id, status="completed"):
     """Insert a payment record and return the payment_id."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO payments (booking_id, amount, transaction_id, status) VALUES (?, ?, ?, ?)",
-        (booking_id, amount, transaction_id, status),
-    )
-    conn.commit()
-    payment_id = cursor.lastrowid
-    conn.close()
-    return payment_id
+    with connection() as conn:
+        return conn.execute(_INSERT_PAYMENT, (booking_id, amount, transaction_id, status)).lastrowid
+
+
+@_timed
+def create_booking(
+    name, email, phone, age, ticket_type, ticket_id, origin, destination, date, price,
+    transaction_id, payment_status="completed", catalog=None, hold_id="",
+):
+    """Insert the user, booking and payment in one transaction and return the receipt row.
 
+    If a `catalog` is given, the ticket's seat (from `hold_id` if it is
+    still live) is taken in the same transaction, so a sold-out ticket
+    rolls the whole booking back.
+    """
+    with connection() as conn:
+        if catalog is not None:
+            catalog.decrement_seats(conn, ticket_type, ticket_id, hold_id=hold_id)
+        user_id = conn.execute(_UPSERT_USER, (name, email, phone, age)).fetchone()[0]
+        booking_id = conn.execute(
+            _INSERT_BOOKING,
+            (user_id, ticket_type, ticket_id, origin, destination, date, price, transaction_id, name, age),
+        ).lastrowid
+        conn.execute(_INSERT_PAYMENT, (booking_id, price, transaction_id, payment_status))
+        receipt = dict(conn.execute(_SELECT_RECEIPT, (booking_id,)).fetchone())
+    _remember_receipt(receipt)
+    return receipt
 
+
+@_timed
+def create_group_booking(
+    passengers, ticket_type, ticket_id, origin, destination, date, price,
+    transaction_id, payment_status="completed", catalog=None, hold_id="",
+):
+    """Book one seat per passenger on the same ticket in one transaction; return the receipt rows.
+
+    `passengers` is a list of (name, email, phone, age). All seats are taken
+    together (from `hold_id` first), so if too few remain nothing is booked.
+    Each email's user row is upserted once, from the first passenger with
+    that email (the lead, for members sharing the lead's contact); every
+    booking keeps its own passenger name and age.
+    """
+    contacts = {}
+    for name, email, phone, age in passengers:
+        contacts.setdefault(email, (name, email, phone, age))
+
+    with connection() as conn:
+        if catalog is not None:
+            catalog.decrement_seats(conn, ticket_type, ticket_id, count=len(passengers), hold_id=hold_id)
+        conn.executemany(_UPSERT_USER, list(contacts.values()))
+        emails = list(contacts)
+        user_ids = dict(conn.execute(
+            f"SELECT email, id FROM users WHERE email IN ({','.join('?' * len(emails))})", emails
+        ).fetchall())
+        # Ids are collected as rows are inserted; transaction ids are not unique
+        booking_ids = [
+            conn.execute(
+                _INSERT_BOOKING,
+                (user_ids[email], ticket_type, ticket_id, origin, destination, date, price, transaction_id, name, age),
+            ).lastrowid
+            for name, email, _phone, age in passengers
+        ]
+        conn.executemany(_INSERT_PAYMENT, [(b, price, transaction_id, payment_status) for b in booking_ids])
+        receipts = [dict(r) for r in conn.execute(
+            _SELECT_RECEIPTS_IN.format(",".join("?" * len(booking_ids))), booking_ids
+        ).fetchall()]
+    for receipt in receipts:
+        _remember_receipt(receipt)
+    return receipts
+
+
+@_timed
 def get_booking_by_id(booking_id):
     """Fetch a single booking by ID."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM bookings WHERE id = ?", (booking_id,))
-    row = cursor.fetchone()
-    conn.close()
+    with connection() as conn:
+        row = conn.execute("SELECT * FROM bookings WHERE id = ?", (booking_id,)).fetchone()
     return dict(row) if row else None
 
 
+BOOKING_HISTORY_COLUMNS = (
+    "booking_id", "ticket_type", "ticket_id", "origin", "destination", "date", "price",
+    "transaction_id", "status", "created_at", "passenger_name", "email",
+)
+_SELECT_HISTORY = """
+    SELECT
+        b.id, b.ticket_type, b.ticket_id, b.origin, b.destination, b.date, b.price,
+        b.transaction_id, b.status, b.created_at, b.passenger_name, u.email
+    FROM bookings b
+    JOIN users u ON u.id = b.user_id
+    WHERE b.id IN (SELECT id FROM bookings WHERE {where} ORDER BY id DESC LIMIT ?)
+    ORDER BY b.id DESC
+"""
+
+
+def _history_query(
+    email=None, transaction_id=None, ticket_type=None, date_from=None, date_to=None, before_id=None, limit=50,
+):
+    where, params = [], []
+    if email:
+        where.append("user_id = (SELECT id FROM users WHERE email = ?)")
+        params.append(email)
+    if transaction_id:
+        where.append("transaction_id = ?")
+        params.append(transaction_id)
+    if ticket_type:
+        where.append("ticket_type = ?")
+        params.append(ticket_type)
+    if date_from:
+        where.append("date >= ?")
+        params.append(date_from)
+    if date_to:
+        where.append("date <= ?")
+        params.append(date_to)
+    if before_id is not None:
+        # With a date range, unary + keeps the planner from walking a whole index by id
+        # instead of seeking (ticket_type, date) and sorting just the matches
+        where.append("+id < ?" if date_from or date_to else "id < ?")
+        params.append(before_id)
+    # Page ids come from the indexes alone; only the page's rows are joined
+    return _SELECT_HISTORY.format(where=" AND ".join(where) or "1"), params + [limit]
+
+
+@_timed
+def list_bookings(
+    email=None, transaction_id=None, ticket_type=None, date_from=None, date_to=None, before_id=None, limit=50,
+):
+    """One page of bookings matching every given filter, newest first.
+
+    Rows are tuples in BOOKING_HISTORY_COLUMNS order; `date_from`/`date_to`
+    bound the travel date (inclusive). Pages are keyed on bookings.id, not
+    OFFSET: pass the last row's booking_id as `before_id` for the next page.
+    Returns (rows, next_before_id), where next_before_id is None on the last page.
+    """
+    sql, params = _history_query(email, transaction_id, ticket_type, date_from, date_to, before_id, limit + 1)
+    with connection() as conn:
+        rows = [tuple(r) for r in conn.execute(sql, params).fetchall()]
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1][0]
+    return rows, None
+
+
+def iter_booking_pages(batch_size=1000, **filters):
+    """Yield every booking matching the filters (see list_bookings) as pages of rows, newest first.
+
+    Each page uses its own short transaction, so a slow consumer never
+    holds a pooled connection.
+    """
+    before_id = filters.pop("before_id", None)
+    while True:
+        rows, before_id = list_bookings(before_id=before_id, limit=batch_size, **filters)
+        if rows:
+            yield rows
+        if before_id is None:
+            return
+
+
+@_timed
 def get_receipt_data(booking_id):
     """Fetch full receipt data by joining users, bookings, and payments."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        SELECT
-            b.id as booking_id, b.ticket_type, b.ticket_id, b.origin, b.destination,
-            b.date, b.price, b.transaction_id, b.status, b.created_at,
-            u.name as passenger_name, u.email, u.phone, u.age,
-            p.amount as payment_amount, p.status as payment_status
-        FROM bookings b
-        JOIN users u ON b.user_id = u.id
-        LEFT JOIN payments p ON p.booking_id = b.id
-        WHERE b.id = ?
-        """,
-        (booking_id,),
-    )
-    row = cursor.fetchone()
-    conn.close()
+    with _recent_lock:
+        receipt = _recent_receipts.get(booking_id)
+    if receipt is not None:
+        return dict(receipt)
+
+    with connection() as conn:
+        row = conn.execute(_SELECT_RECEIPT, (booking_id,)).fetchone()
+    return dict(row) if row else None
+
+
+@_timed
+def get_receipts_data(booking_ids):
+    """Fetch receipt data for many bookings at once, in booking id order."""
+    booking_ids = list(booking_ids)
+    receipts = []
+    with connection() as conn:
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(booking_ids), 500):
+            chunk = booking_ids[start:start + 500]
+            rows = conn.execute(_SELECT_RECEIPTS_IN.format(",".join("?" * len(chunk))), chunk).fetchall()
+            receipts.extend(dict(r) for r in rows)
+    return sorted(receipts, key=lambda r: r["booking_id"])
+
+
+@_timed
+def get_session_revision(session_id):
+    """Return the stored revision of a chat session, or None if it doesn't exist."""
+    with connection() as conn:
+        row = conn.execute("SELECT revision FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+    return row[0] if row else None
+
+
+@_timed
+def load_session(session_id):
+    """Return (revision, serialized messages) for a chat session, or None."""
+    with connection() as conn:
+        row = conn.execute(
+            "SELECT revision, messages FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+    return (row[0], row[1]) if row else None
+
+
+@_timed
+def save_session(session_id, messages):
+    """Insert or replace a chat session's serialized messages and return its new revision."""
+    with connection() as conn:
+        return conn.execute(
+            """INSERT INTO sessions (session_id, messages) VALUES (?, ?)
+            ON CONFLICT (session_id) DO UPDATE SET
+                messages = excluded.messages, revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+            RETURNING revision""",
+            (session_id, messages),
+        ).fetchone()[0]
+
+
+@_timed
+def delete_session(session_id):
+    """Delete a chat session."""
+    with connection() as conn:
+        conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+
+@_timed
+def get_llm_cache(key, min_created_at):
+    """Return a cached LLM response newer than `min_created_at` and mark it used, or None."""
+    with connection() as conn:
+        row = conn.execute(
+            "SELECT response FROM llm_cache WHERE key = ? AND created_at >= ?", (key, min_created_at)
+        ).fetchone()
+        if row:
+            conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+    return row[0] if row else None
+
+
+@_timed
+def put_llm_cache(key, response):
+    """Insert or replace a cached LLM response."""
+    now = time.time()
+    with connection() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, response, created_at, last_used) VALUES (?, ?, ?, ?)",
+            (key, response, now, now),
+        )
+
+
+@_timed
+def prune_llm_cache(max_rows, min_created_at):
+    """Drop expired cache rows and keep at most `max_rows` most recently used."""
+    with connection() as conn:
+        conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (min_created_at,))
+        conn.execute(
+            """DELETE FROM llm_cache WHERE key IN (
+                SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )""",
+            (max_rows,),
+        )
+
+
+@_timed
+def enqueue_email(recipient, message):
+    """Add a serialized email to the outbox and return its id."""
+    now = time.time()
+    with connection() as conn:
+        return conn.execute(
+            "INSERT INTO email_outbox (recipient, message, next_attempt_at, created_at) VALUES (?, ?, ?, ?)",
+            (recipient, message, now, now),
+        ).lastrowid
+
+
+@_timed
+def claim_outbox_batch(limit, lease_seconds):
+    """Lease up to `limit` due emails for sending and return them as dicts.
+
+    Claimed rows move to 'sending' with next_attempt_at pushed out by the
+    lease, so a worker that dies mid-batch has its emails picked up again
+    once the lease runs out.
+    """
+    now = time.time()
+    with connection() as conn:
+        rows = conn.execute(
+            """UPDATE email_outbox SET status = 'sending', next_attempt_at = ?
+            WHERE id IN (
+                SELECT id FROM email_outbox
+                WHERE status IN ('pending', 'sending') AND next_attempt_at <= ?
+                ORDER BY next_attempt_at LIMIT ?
+            )
+            RETURNING id, recipient, message, attempts""",
+            (now + lease_seconds, now, limit),
+        ).fetchall()
+    return [dict(r) for r in rows]
+
+
+@_timed
+def mark_emails_sent(email_ids):
+    """Mark outbox emails as delivered."""
+    with connection() as conn:
+        conn.executemany(
+            "UPDATE email_outbox SET status = 'sent', attempts = attempts + 1, sent_at = ?, last_error = NULL WHERE id = ?",
+            [(time.time(), email_id) for email_id in email_ids],
+        )
+
+
+@_timed
+def mark_email_retry(email_id, next_attempt_at, error):
+    """Record a failed delivery attempt and schedule the next one."""
+    with connection() as conn:
+        conn.execute(
+            """UPDATE email_outbox SET status = 'pending', attempts = attempts + 1, next_attempt_at = ?, last_error = ?
+            WHERE id = ?""",
+            (next_attempt_at, error, email_id),
+        )
+
+
+@_timed
+def mark_email_failed(email_id, error):
+    """Give up on an email after a permanent error or too many attempts."""
+    with connection() as conn:
+        conn.execute(
+            "UPDATE email_outbox SET status = 'failed', attempts = attempts + 1, last_error = ? WHERE id = ?",
+            (error, email_id),
+        )
+
+
+@_timed
+def get_email_status(email_id):
+    """Return the outbox row for an email (without the message body), or None."""
+    with connection() as conn:
+        row = conn.execute(
+            "SELECT id, recipient, status, attempts, last_error, created_at, sent_at FROM email_outbox WHERE id = ?",
+            (email_id,),
+        ).fetchone()
     return dict(row) if row else None
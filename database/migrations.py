@@ -0,0 +1,173 @@
+# Versioned schema migrations. The applied version lives in SQLite's
+# `PRAGMA user_version`, so startup only runs migrations newer than the DB.
+
+
+def _add_lookup_indexes(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_payments_booking_id ON payments (booking_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_bookings_transaction_id ON bookings (transaction_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_bookings_user_id ON bookings (user_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_email ON users (email)")
+
+
+def _unique_user_email(conn):
+    # Keep each booking's own passenger before its user row is merged away
+    _booking_passenger_columns(conn)
+    # Fold duplicate users (one row per past booking) into the newest row per email
+    conn.execute("""
+        UPDATE bookings SET user_id = (
+            SELECT MAX(u2.id) FROM users u1 JOIN users u2 ON u2.email = u1.email
+            WHERE u1.id = bookings.user_id
+        )
+    """)
+    conn.execute("DELETE FROM users WHERE id NOT IN (SELECT MAX(id) FROM users GROUP BY email)")
+    conn.execute("DROP INDEX IF EXISTS idx_users_email")
+    conn.execute("CREATE UNIQUE INDEX idx_users_email ON users (email)")
+
+
+def _sessions_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            messages TEXT NOT NULL,
+            revision INTEGER NOT NULL DEFAULT 1,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def _llm_cache_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            key TEXT PRIMARY KEY,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used)")
+
+
+def _ticket_tables(conn):
+    for table in ("flights", "trains", "movies"):
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                id TEXT PRIMARY KEY,
+                origin_key TEXT NOT NULL DEFAULT '',
+                destination_key TEXT NOT NULL DEFAULT '',
+                date TEXT,
+                departure_min INTEGER,
+                duration_min INTEGER,
+                price REAL NOT NULL DEFAULT 0,
+                class_key TEXT,
+                genre_key TEXT,
+                seats_available INTEGER,
+                data TEXT NOT NULL
+            )
+        """)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_route ON {table} (origin_key, destination_key, date)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_destination ON {table} (destination_key, date)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_date ON {table} (date)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_price ON {table} (price)")
+
+
+def _seat_holds_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS seat_holds (
+            hold_id TEXT PRIMARY KEY,
+            ticket_type TEXT NOT NULL,
+            ticket_id TEXT NOT NULL,
+            seats INTEGER NOT NULL,
+            expires_at REAL NOT NULL,
+            created_at REAL NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_seat_holds_expires_at ON seat_holds (expires_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_seat_holds_ticket ON seat_holds (ticket_type, ticket_id)")
+
+
+def _email_outbox_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            recipient TEXT NOT NULL,
+            message TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            last_error TEXT,
+            created_at REAL NOT NULL,
+            sent_at REAL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox (status, next_attempt_at)")
+
+
+def _booking_passenger_columns(conn):
+    # Users are one row per email and updated on every booking, so each
+    # booking records its own passenger; older rows take the user's details.
+    # Also run by migration 2, so the columns may already exist.
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(bookings)")}
+    if "passenger_name" not in columns:
+        conn.execute("ALTER TABLE bookings ADD COLUMN passenger_name TEXT")
+    if "passenger_age" not in columns:
+        conn.execute("ALTER TABLE bookings ADD COLUMN passenger_age INTEGER")
+    conn.execute("""
+        UPDATE bookings SET
+            passenger_name = COALESCE(passenger_name, (SELECT name FROM users WHERE users.id = bookings.user_id)),
+            passenger_age = COALESCE(passenger_age, (SELECT age FROM users WHERE users.id = bookings.user_id))
+        WHERE passenger_name IS NULL OR passenger_age IS NULL
+    """)
+
+
+def _booking_history_indexes(conn):
+    # With the implicit rowid suffix these serve `... ORDER BY id` keyset scans
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_bookings_ticket_type ON bookings (ticket_type)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_bookings_date ON bookings (date)")
+
+
+def _booking_type_date_index(conn):
+    # A ticket type plus a date range otherwise scans every booking of that type
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_bookings_type_date ON bookings (ticket_type, date, id)")
+
+
+# (version, description, apply) — append only, never reorder
+MIGRATIONS = [
+    (1, "indexes for receipt, transaction and user lookups", _add_lookup_indexes),
+    (2, "one user row per email", _unique_user_email),
+    (3, "persistent chat sessions", _sessions_table),
+    (4, "LLM response cache", _llm_cache_table),
+    (5, "ticket inventory tables", _ticket_tables),
+    (6, "short-lived seat holds", _seat_holds_table),
+    (7, "email outbox", _email_outbox_table),
+    (8, "per-booking passenger name and age", _booking_passenger_columns),
+    (9, "booking history lookups by ticket type and date", _booking_history_indexes),
+    (10, "booking history lookups by ticket type within a date range", _booking_type_date_index),
+]
+
+
+def get_version(conn):
+    """Return the schema version recorded in the database."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(conn):
+    """Apply pending migrations in order and return the list of versions applied.
+
+    Each migration runs in its own transaction together with the version bump.
+    """
+    applied = []
+    for version, _description, apply in MIGRATIONS:
+        if get_version(conn) >= version:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another worker may have migrated while we waited for the write lock
+            if get_version(conn) < version:
+                apply(conn)
+                conn.execute(f"PRAGMA user_version = {int(version)}")
+                applied.append(version)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    return applied
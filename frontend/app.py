@@ -75,6 +75,8 @@ with st.sidebar:
 for msg in st.session_state.messages:
     with st.chat_message(msg["role"]):
         st.markdown(msg["content"])
+        if msg.get("llm_calls"):
+            st.caption(f"LLM calls this turn: {msg['llm_calls']}")
         if msg.get("steps"):
             with st.expander("Reasoning Steps", expanded=False):
                 for step in msg["steps"]:
@@ -98,13 +100,27 @@ if prompt := st.chat_input("What would you like to book?"):
             final_text = ""
             streamed_tokens = ""
 
-            for event in agent.stream(
+            llm_calls = 0
+            final_state = None
+
+            # One graph run: "updates" drives the live UI, "values" carries the full state
+            for mode, event in agent.stream(
                 {"messages": st.session_state.agent_messages, "steps": []},
-                stream_mode="updates",
+                stream_mode=["updates", "values"],
             ):
-                # Handle agent node events
+                if mode == "values":
+                    final_state = event
+                    continue
+
+                # Handle fast-path router events (no LLM call)
+                if "router" in event:
+                    all_steps.extend(event["router"].get("steps", []))
+
+                # Handle agent node events (one LLM call each, unless answered from the cache)
                 if "agent" in event:
                     agent_data = event["agent"]
+                    if not agent_data.get("llm_cached"):
+                        llm_calls += 1
                     msgs = agent_data.get("messages", [])
                     new_steps = agent_data.get("steps", [])
                     all_steps.extend(new_steps)
@@ -126,13 +142,10 @@ if prompt := st.chat_input("What would you like to book?"):
             # Final render (remove cursor)
             final_text = streamed_tokens or "Done."
             response_placeholder.markdown(final_text)
+            st.caption(f"LLM calls this turn: {llm_calls}")
 
-            # Get final messages from a full invoke to keep state consistent
-            result = agent.invoke({
-                "messages": st.session_state.agent_messages,
-                "steps": [],
-            })
-            st.session_state.agent_messages = result["messages"]
+            if final_state is not None:
+                st.session_state.agent_messages = final_state["messages"]
 
             if all_steps:
                 with st.expander("Reasoning Steps", expanded=False):
@@ -143,6 +156,7 @@ if prompt := st.chat_input("What would you like to book?"):
                 "role": "assistant",
                 "content": final_text,
                 "steps": all_steps,
+                "llm_calls": llm_calls,
             })
 
         except Exception as e:
@@ -0,0 +1,153 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Minimal in-process counters and histograms, rendered in the Prometheus
+# text exposition format by render(). Metrics are per process.
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names, values, extra=""):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        _registry.append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _header(self, name=None):
+        name = name or self.name
+        return [f"# HELP {name} {self.documentation}", f"# TYPE {name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic count, optionally split by labels."""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def render(self):
+        # Text format 0.0.4 types the sample name, so the header names the _total series
+        lines = self._header(f"{self.name}_total")
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}_total{_label_text(self.labelnames, key)} {_format(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (seconds, tokens) in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of the `with` block, even if it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels):
+        entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    def render(self):
+        lines = self._header()
+        with self._lock:
+            for key, (counts, total, n) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, c in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += c
+                    le = "+Inf" if bound == float("inf") else _format(float(bound))
+                    labels = _label_text(self.labelnames, key, 'le="' + le + '"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                lines.append(f"{self.name}_sum{_label_text(self.labelnames, key)} {_format(total)}")
+                lines.append(f"{self.name}_count{_label_text(self.labelnames, key)} {n}")
+        return lines
+
+
+def render():
+    """All registered metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ── Metrics ──────────────────────────────────────────────────
+NODE_SECONDS = Histogram("omnibook_graph_node_seconds", "Time spent in each agent graph node.", ["node"])
+TOOL_SECONDS = Histogram(
+    "omnibook_tool_seconds", "Tool call latency by tool and outcome (ok, error, timeout).", ["tool", "outcome"]
+)
+DB_CALL_SECONDS = Histogram("omnibook_db_call_seconds", "Latency of database/db.py operations.", ["operation"])
+DB_CONNECTION_SECONDS = Histogram(
+    "omnibook_db_connection_held_seconds", "Time a pooled SQLite connection is held per use (all callers)."
+)
+SMTP_SEND_SECONDS = Histogram("omnibook_smtp_send_seconds", "SMTP send latency by outcome.", ["outcome"])
+EMAILS = Counter("omnibook_emails", "Outbox deliveries by result (sent, retry, failed).", ["result"])
+LLM_SECONDS = Histogram("omnibook_llm_request_seconds", "LLM call latency; cached responses are labelled.", ["cached"])
+LLM_TOKENS = Counter("omnibook_llm_tokens", "LLM tokens reported by the provider.", ["kind"])
+
+
+def record_llm_usage(response):
+    """Add the prompt/completion token counts of an LLM response, if the provider reported them."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    prompt, completion = usage.get("input_tokens"), usage.get("output_tokens")
+    if prompt is None:
+        token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+        prompt, completion = token_usage.get("prompt_tokens"), token_usage.get("completion_tokens")
+    if prompt:
+        LLM_TOKENS.inc(prompt, kind="prompt")
+    if completion:
+        LLM_TOKENS.inc(completion, kind="completion")
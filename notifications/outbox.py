@@ -0,0 +1,227 @@
+import random
+import smtplib
+import sqlite3
+import threading
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from config import (
+    EMAIL_BATCH_SIZE, EMAIL_MAX_ATTEMPTS, EMAIL_POLL_INTERVAL, EMAIL_RETRY_BASE,
+    SMTP_EMAIL, SMTP_HOST, SMTP_IDLE_TIMEOUT, SMTP_PASSWORD, SMTP_PORT, SMTP_STARTTLS,
+)
+from database import db
+from monitoring.metrics import EMAILS, SMTP_SEND_SECONDS
+
+# Emails are written to the email_outbox table and delivered by a background
+# worker, so the booking flow never waits on an SMTP handshake. Delivery is
+# at-least-once: a worker that dies mid-batch may resend after its lease ends.
+
+_LEASE_SECONDS = 120
+_MAX_RETRY_DELAY = 3600
+
+
+def retry_delay(attempts):
+    """Seconds to wait after the n-th failed attempt: exponential backoff with jitter."""
+    delay = min(EMAIL_RETRY_BASE * 2 ** (attempts - 1), _MAX_RETRY_DELAY)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _is_permanent(error):
+    """5xx replies (other than auth failures, which a config fix resolves) won't succeed on retry."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return (
+        isinstance(error, smtplib.SMTPResponseException)
+        and not isinstance(error, smtplib.SMTPAuthenticationError)
+        and 500 <= error.smtp_code < 600
+    )
+
+
+class SMTPSender:
+    """One authenticated SMTP connection, opened on first use and reused across sends."""
+
+    def __init__(
+        self, host=SMTP_HOST, port=SMTP_PORT, username=SMTP_EMAIL, password=SMTP_PASSWORD,
+        starttls=SMTP_STARTTLS, timeout=30,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.last_used = 0.0
+        self._server = None
+
+    @property
+    def connected(self):
+        return self._server is not None
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls()
+            if self.password:
+                server.login(self.username, self.password)
+        except BaseException:
+            server.close()
+            raise
+        return server
+
+    def send(self, sender, recipient, message):
+        """Send one serialized message, reconnecting once if the idle connection was dropped."""
+        for retry in (False, True):
+            if self._server is None:
+                self._server = self._connect()
+            try:
+                self._server.sendmail(sender, [recipient], message)
+                self.last_used = time.monotonic()
+                return
+            except smtplib.SMTPServerDisconnected:
+                self._server = None
+                if retry:
+                    raise
+
+    def close(self):
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except (smtplib.SMTPException, OSError):
+            self._server.close()
+        self._server = None
+
+
+class OutboxWorker:
+    """Background thread that drains the email outbox in batches over one SMTP connection.
+
+    Failed sends are retried with exponential backoff up to EMAIL_MAX_ATTEMPTS;
+    permanent rejections fail immediately. The connection is closed after
+    SMTP_IDLE_TIMEOUT seconds without mail.
+    """
+
+    def __init__(
+        self, sender=None, from_address=SMTP_EMAIL, batch_size=EMAIL_BATCH_SIZE,
+        poll_interval=EMAIL_POLL_INTERVAL, idle_timeout=SMTP_IDLE_TIMEOUT,
+    ):
+        self.sender = sender or SMTPSender()
+        self.from_address = from_address
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="omnibook-outbox", daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        """Check the outbox now instead of at the next poll."""
+        self._wake.set()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _retry(self, email, error):
+        attempts = email["attempts"] + 1
+        if attempts >= EMAIL_MAX_ATTEMPTS:
+            db.mark_email_failed(email["id"], str(error))
+            EMAILS.inc(result="failed")
+        else:
+            EMAILS.inc(result="retry")
+            db.mark_email_retry(email["id"], time.time() + retry_delay(attempts), str(error))
+
+    def run_once(self):
+        """Deliver one batch of due emails; returns how many were claimed."""
+        batch = db.claim_outbox_batch(self.batch_size, _LEASE_SECONDS)
+        sent = []
+        for i, email in enumerate(batch):
+            started = time.perf_counter()
+            try:
+                self.sender.send(self.from_address, email["recipient"], email["message"])
+                SMTP_SEND_SECONDS.observe(time.perf_counter() - started, outcome="sent")
+                sent.append(email["id"])
+            except (smtplib.SMTPException, OSError) as e:
+                SMTP_SEND_SECONDS.observe(time.perf_counter() - started, outcome="error")
+                if _is_permanent(e):
+                    db.mark_email_failed(email["id"], str(e))
+                    EMAILS.inc(result="failed")
+                elif isinstance(e, smtplib.SMTPResponseException) and self.sender.connected:
+                    # Temporary rejection of this message; the connection is still usable
+                    self._retry(email, e)
+                else:
+                    # Connection-level failure: back off the rest of the batch too
+                    self.sender.close()
+                    for pending in batch[i:]:
+                        self._retry(pending, e)
+                    break
+            except Exception as e:
+                # A message smtplib can't send (e.g. a non-ASCII address) fails on its own;
+                # the connection may be mid-transaction, so start the next one afresh
+                SMTP_SEND_SECONDS.observe(time.perf_counter() - started, outcome="error")
+                self.sender.close()
+                db.mark_email_failed(email["id"], f"{type(e).__name__}: {e}")
+                EMAILS.inc(result="failed")
+        if sent:
+            db.mark_emails_sent(sent)
+            EMAILS.inc(len(sent), result="sent")
+        return len(batch)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                claimed = self.run_once()
+            except sqlite3.Error:
+                # Busy database: try again on the next poll
+                claimed = 0
+            except Exception:
+                # Nothing may end the only delivery thread; claimed rows retry after their lease
+                self.sender.close()
+                claimed = 0
+            if claimed:
+                continue
+            if self.sender.connected and time.monotonic() - self.sender.last_used > self.idle_timeout:
+                self.sender.close()
+            self._wake.wait(self.poll_interval)
+        self.sender.close()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_outbox_worker():
+    """Return the process-wide outbox worker, starting it on first use."""
+    global _worker
+    if _worker is None:
+        with _worker_lock:
+            if _worker is None:
+                worker = OutboxWorker()
+                worker.start()
+                _worker = worker
+    return _worker
+
+
+def queue_email(recipient, subject, html_body, text_body=None):
+    """Write an HTML email (with an optional plain-text alternative) to the outbox,
+    wake the worker, and return the outbox id."""
+    msg = MIMEMultipart("alternative")
+    msg["From"] = f"OmniBook AI <{SMTP_EMAIL}>"
+    msg["To"] = recipient
+    msg["Subject"] = subject
+    # Clients show the last part they support, so plain text goes first
+    if text_body:
+        msg.attach(MIMEText(text_body, "plain", "utf-8"))
+    msg.attach(MIMEText(html_body, "html", "utf-8"))
+
+    email_id = db.enqueue_email(recipient, msg.as_string())
+    get_outbox_worker().wake()
+    return email_id
@@ -0,0 +1,390 @@
+import html
+from string import Formatter
+from database.db import get_receipt_data
+
+# Confirmation email and receipt templates, compiled once at import. Values
+# are formatted once per booking by Receipt and shared by every renderer.
+
+
+class Template:
+    """A str.format-style template pre-split into literal text and field slots."""
+
+    def __init__(self, source):
+        self.parts = []
+        self.slots = []
+        for literal, field, _spec, _conversion in Formatter().parse(source):
+            if literal:
+                self.parts.append(literal)
+            if field is not None:
+                self.slots.append((len(self.parts), field))
+                self.parts.append("")
+
+    def render(self, values):
+        out = self.parts[:]
+        for i, field in self.slots:
+            out[i] = values[field]
+        return "".join(out)
+
+
+class Receipt:
+    """Receipt row of one booking, with display values formatted once for all renderers."""
+
+    def __init__(self, data):
+        self.data = data
+        self.booking_id = data["booking_id"]
+        self.text_fields = {
+            "booking_id": str(data["booking_id"]),
+            "created_at": str(data["created_at"]),
+            "status": str(data["status"] or "").upper(),
+            "passenger_name": str(data["passenger_name"]),
+            "email": str(data["email"]),
+            "phone": str(data["phone"]),
+            "age": str(data["age"]),
+            "ticket_type": str(data["ticket_type"]).upper(),
+            "ticket_id": str(data["ticket_id"]),
+            "origin": str(data["origin"]),
+            "destination": str(data["destination"]),
+            "date": str(data["date"]),
+            "price": f"{data['price']:.2f}",
+            "transaction_id": str(data["transaction_id"]),
+            "payment_status": str(data["payment_status"] or "").upper(),
+        }
+        self.html_fields = {key: html.escape(value) for key, value in self.text_fields.items()}
+
+
+class GroupReceipt:
+    """Receipts of one group booking (same ticket and transaction), combined for one receipt and email."""
+
+    def __init__(self, rows):
+        self.receipts = [row if isinstance(row, Receipt) else Receipt(row) for row in rows]
+        lead = self.receipts[0]
+        total = sum(receipt.data["price"] for receipt in self.receipts)
+        self.text_fields = dict(
+            lead.text_fields,
+            count=str(len(self.receipts)),
+            total=f"{total:.2f}",
+            booking_ids=", ".join(f"#{receipt.booking_id}" for receipt in self.receipts),
+        )
+        self.html_fields = {key: html.escape(value) for key, value in self.text_fields.items()}
+
+    def passenger_lines(self, template, html_values=False):
+        rows = []
+        for n, receipt in enumerate(self.receipts, 1):
+            values = receipt.html_fields if html_values else receipt.text_fields
+            rows.append(template.render(dict(values, n=str(n))))
+        return rows
+
+
+def load_receipt(booking_id):
+    """Return the Receipt of a booking, or None if it doesn't exist."""
+    data = get_receipt_data(booking_id)
+    return Receipt(data) if data else None
+
+
+RECEIPT_TEXT = Template("""========================================
+     OMNIBOOK AI - BOOKING RECEIPT
+========================================
+Booking ID    : #{booking_id}
+Date Booked   : {created_at}
+Status        : {status}
+----------------------------------------
+PASSENGER DETAILS
+  Name        : {passenger_name}
+  Email       : {email}
+  Phone       : {phone}
+  Age         : {age}
+----------------------------------------
+TICKET DETAILS
+  Type        : {ticket_type}
+  Ticket ID   : {ticket_id}
+  From        : {origin}
+  To          : {destination}
+  Date        : {date}
+----------------------------------------
+PAYMENT DETAILS
+  Amount      : \u20b9{price}
+  Transaction : {transaction_id}
+  Pay Status  : {payment_status}
+========================================
+ Thank you for booking with OmniBook AI!
+========================================""")
+
+EMAIL_SUBJECT = Template("OmniBook AI - Booking Confirmation #{booking_id}")
+
+EMAIL_TEXT = Template("""Dear {passenger_name},
+
+Your booking has been confirmed. Here are the details:
+
+{receipt}
+
+This is an automated confirmation email.
+""")
+
+# The HTML email is assembled from sections shared with the group confirmation
+_HTML_OPEN = """<html>
+<body style="margin:0; padding:0; font-family: 'Segoe UI', Arial, sans-serif; background-color: #f4f4f7;">
+  <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #f4f4f7; padding: 40px 0;">
+    <tr>
+      <td align="center">
+        <table width="600" cellpadding="0" cellspacing="0" style="background: #ffffff; border-radius: 12px; overflow: hidden; box-shadow: 0 4px 20px rgba(0,0,0,0.08);">
+
+          <!-- Header -->
+          <tr>
+            <td style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 35px 40px; text-align: center;">
+              <h1 style="color: #ffffff; margin: 0; font-size: 28px;">✈️ OmniBook AI</h1>
+              <p style="color: #e0d4f7; margin: 8px 0 0; font-size: 14px;">Booking Confirmation</p>
+            </td>
+          </tr>
+
+          <!-- Status Badge -->
+          <tr>
+            <td style="padding: 30px 40px 0; text-align: center;">
+              <span style="background: #d4edda; color: #155724; padding: 8px 24px; border-radius: 20px; font-weight: 600; font-size: 14px;">✅ CONFIRMED</span>
+            </td>
+          </tr>
+
+          <!-- Greeting -->
+          <tr>
+            <td style="padding: 25px 40px 10px;">
+              <p style="font-size: 16px; color: #333;">Dear <strong>{passenger_name}</strong>,</p>
+              <p style="font-size: 15px; color: #555; line-height: 1.6;">Your booking has been confirmed. Here are the details:</p>
+            </td>
+          </tr>
+
+"""
+
+_HTML_BOOKING = """          <!-- Booking Details Card -->
+          <tr>
+            <td style="padding: 10px 40px;">
+              <table width="100%" style="background: #f8f9ff; border-radius: 10px; border: 1px solid #e8e8f0;" cellpadding="15" cellspacing="0">
+                <tr>
+                  <td colspan="2" style="border-bottom: 1px solid #e8e8f0; padding: 15px 20px;">
+                    <strong style="color: #667eea; font-size: 15px;">📋 Booking Details</strong>
+                  </td>
+                </tr>
+                <tr>
+                  <td style="color: #777; font-size: 14px; padding: 10px 20px; width: 40%;">Booking ID</td>
+                  <td style="color: #333; font-size: 14px; font-weight: 600; padding: 10px 20px;">#{booking_id}</td>
+                </tr>
+                <tr style="background: #ffffff;">
+                  <td style="color: #777; font-size: 14px; padding: 10px 20px;">Type</td>
+                  <td style="color: #333; font-size: 14px; font-weight: 600; padding: 10px 20px;">{ticket_type}</td>
+                </tr>
+                <tr>
+                  <td style="color: #777; font-size: 14px; padding: 10px 20px;">Ticket ID</td>
+                  <td style="color: #333; font-size: 14px; font-weight: 600; padding: 10px 20px;">{ticket_id}</td>
+                </tr>
+                <tr style="background: #ffffff;">
+                  <td style="color: #777; font-size: 14px; padding: 10px 20px;">From</td>
+                  <td style="color: #333; font-size: 14px; font-weight: 600; padding: 10px 20px;">{origin}</td>
+                </tr>
+                <tr>
+                  <td style="color: #777; font-size: 14px; padding: 10px 20px;">To</td>
+                  <td style="color: #333; font-size: 14px; font-weight: 600; padding: 10px 20px;">{destination}</td>
+                </tr>
+                <tr style="background: #ffffff;">
+                  <td style="color: #777; font-size: 14px; padding: 10px 20px;">Date</td>
+                  <td style="color: #333; font-size: 14px; font-weight: 600; padding: 10px 20px;">{date}</td>
+                </tr>
+              </table>
+            </td>
+          </tr>
+
+"""
+
+_HTML_PASSENGER = """          <!-- Passenger Details -->
+          <tr>
+            <td style="padding: 15px 40px;">
+              <table width="100%" style="background: #fff8f0; border-radius: 10px; border: 1px solid #f0e0c8;" cellpadding="15" cellspacing="0">
+                <tr>
+                  <td colspan="2" style="border-bottom: 1px solid #f0e0c8; padding: 15px 20px;">
+                    <strong style="color: #e67e22; font-size: 15px;">👤 Passenger</strong>
+                  </td>
+                </tr>
+                <tr>
+                  <td style="color: #777; font-size: 14px; padding: 10px 20px; width: 40%;">Name</td>
+                  <td style="color: #333; font-size: 14px; font-weight: 600; padding: 10px 20px;">{passenger_name}</td>
+                </tr>
+                <tr style="background: #ffffff;">
+                  <td style="color: #777; font-size: 14px; padding: 10px 20px;">Email</td>
+                  <td style="color: #333; font-size: 14px; padding: 10px 20px;">{email}</td>
+                </tr>
+                <tr>
+                  <td style="color: #777; font-size: 14px; padding: 10px 20px;">Phone</td>
+                  <td style="color: #333; font-size: 14px; padding: 10px 20px;">{phone}</td>
+                </tr>
+              </table>
+            </td>
+          </tr>
+
+"""
+
+_HTML_PAYMENT = """          <!-- Payment -->
+          <tr>
+            <td style="padding: 5px 40px 15px;">
+              <table width="100%" style="background: #f0f9f4; border-radius: 10px; border: 1px solid #c8e6d0;" cellpadding="15" cellspacing="0">
+                <tr>
+                  <td colspan="2" style="border-bottom: 1px solid #c8e6d0; padding: 15px 20px;">
+                    <strong style="color: #27ae60; font-size: 15px;">💳 Payment</strong>
+                  </td>
+                </tr>
+                <tr>
+                  <td style="color: #777; font-size: 14px; padding: 10px 20px; width: 40%;">Amount</td>
+                  <td style="color: #333; font-size: 20px; font-weight: 700; padding: 10px 20px;">₹{price}</td>
+                </tr>
+                <tr style="background: #ffffff;">
+                  <td style="color: #777; font-size: 14px; padding: 10px 20px;">Transaction ID</td>
+                  <td style="color: #333; font-size: 13px; font-family: monospace; padding: 10px 20px;">{transaction_id}</td>
+                </tr>
+                <tr>
+                  <td style="color: #777; font-size: 14px; padding: 10px 20px;">Status</td>
+                  <td style="padding: 10px 20px;"><span style="background: #d4edda; color: #155724; padding: 4px 12px; border-radius: 12px; font-size: 13px; font-weight: 600;">{payment_status}</span></td>
+                </tr>
+              </table>
+            </td>
+          </tr>
+
+"""
+
+_HTML_CLOSE = """          <!-- Footer -->
+          <tr>
+            <td style="padding: 25px 40px 35px; text-align: center; border-top: 1px solid #eee;">
+              <p style="color: #999; font-size: 13px; margin: 0;">Thank you for booking with OmniBook AI!</p>
+              <p style="color: #bbb; font-size: 12px; margin: 8px 0 0;">This is an automated confirmation email.</p>
+            </td>
+          </tr>
+
+        </table>
+      </td>
+    </tr>
+  </table>
+</body>
+</html>
+"""
+
+EMAIL_HTML = Template(_HTML_OPEN + _HTML_BOOKING + _HTML_PASSENGER + _HTML_PAYMENT + _HTML_CLOSE)
+
+
+def render_receipt_text(receipt):
+    """Plain-text receipt shown in chat and used in the email's text part."""
+    return RECEIPT_TEXT.render(receipt.text_fields)
+
+
+def render_confirmation(receipt):
+    """Return (subject, html_body, text_body) of the confirmation email."""
+    subject = EMAIL_SUBJECT.render(receipt.text_fields)
+    text = EMAIL_TEXT.render({"passenger_name": receipt.text_fields["passenger_name"], "receipt": render_receipt_text(receipt)})
+    return subject, EMAIL_HTML.render(receipt.html_fields), text
+
+
+GROUP_RECEIPT_TEXT = Template("""========================================
+  OMNIBOOK AI - GROUP BOOKING RECEIPT
+========================================
+Bookings      : {booking_ids}
+Date Booked   : {created_at}
+Status        : {status}
+----------------------------------------
+PASSENGERS ({count})
+{passengers}
+  Contact     : {email}, {phone}
+----------------------------------------
+TICKET DETAILS
+  Type        : {ticket_type}
+  Ticket ID   : {ticket_id}
+  From        : {origin}
+  To          : {destination}
+  Date        : {date}
+----------------------------------------
+PAYMENT DETAILS
+  Fare        : \u20b9{price} x {count}
+  Total       : \u20b9{total}
+  Transaction : {transaction_id}
+  Pay Status  : {payment_status}
+========================================
+ Thank you for booking with OmniBook AI!
+========================================""")
+
+GROUP_PASSENGER_TEXT = Template("  {n}. {passenger_name} (age {age}) - booking #{booking_id}")
+
+GROUP_EMAIL_SUBJECT = Template("OmniBook AI - Group Booking Confirmation #{booking_id} ({count} passengers)")
+
+_HTML_GROUP_PASSENGER_ROW = Template("""                <tr>
+                  <td style="color: #777; font-size: 14px; padding: 10px 20px; width: 40%;">#{booking_id}</td>
+                  <td style="color: #333; font-size: 14px; font-weight: 600; padding: 10px 20px;">{passenger_name} <span style="color: #777; font-weight: 400;">(age {age})</span></td>
+                </tr>
+""")
+
+_HTML_GROUP_PASSENGERS = """          <!-- Passengers -->
+          <tr>
+            <td style="padding: 15px 40px;">
+              <table width="100%" style="background: #fff8f0; border-radius: 10px; border: 1px solid #f0e0c8;" cellpadding="15" cellspacing="0">
+                <tr>
+                  <td colspan="2" style="border-bottom: 1px solid #f0e0c8; padding: 15px 20px;">
+                    <strong style="color: #e67e22; font-size: 15px;">👥 Passengers ({count})</strong>
+                  </td>
+                </tr>
+{passengers}                <tr style="background: #ffffff;">
+                  <td style="color: #777; font-size: 14px; padding: 10px 20px;">Contact</td>
+                  <td style="color: #333; font-size: 14px; padding: 10px 20px;">{email}, {phone}</td>
+                </tr>
+              </table>
+            </td>
+          </tr>
+
+"""
+
+_HTML_GROUP_PAYMENT = """          <!-- Payment -->
+          <tr>
+            <td style="padding: 5px 40px 15px;">
+              <table width="100%" style="background: #f0f9f4; border-radius: 10px; border: 1px solid #c8e6d0;" cellpadding="15" cellspacing="0">
+                <tr>
+                  <td colspan="2" style="border-bottom: 1px solid #c8e6d0; padding: 15px 20px;">
+                    <strong style="color: #27ae60; font-size: 15px;">💳 Payment</strong>
+                  </td>
+                </tr>
+                <tr>
+                  <td style="color: #777; font-size: 14px; padding: 10px 20px; width: 40%;">Amount</td>
+                  <td style="color: #333; font-size: 20px; font-weight: 700; padding: 10px 20px;">₹{total}</td>
+                </tr>
+                <tr style="background: #ffffff;">
+                  <td style="color: #777; font-size: 14px; padding: 10px 20px;">Fare</td>
+                  <td style="color: #333; font-size: 14px; padding: 10px 20px;">₹{price} x {count}</td>
+                </tr>
+                <tr>
+                  <td style="color: #777; font-size: 14px; padding: 10px 20px;">Transaction ID</td>
+                  <td style="color: #333; font-size: 13px; font-family: monospace; padding: 10px 20px;">{transaction_id}</td>
+                </tr>
+                <tr style="background: #ffffff;">
+                  <td style="color: #777; font-size: 14px; padding: 10px 20px;">Status</td>
+                  <td style="padding: 10px 20px;"><span style="background: #d4edda; color: #155724; padding: 4px 12px; border-radius: 12px; font-size: 13px; font-weight: 600;">{payment_status}</span></td>
+                </tr>
+              </table>
+            </td>
+          </tr>
+
+"""
+
+GROUP_EMAIL_HTML = Template(
+    _HTML_OPEN
+    + _HTML_BOOKING.replace(">Booking ID<", ">Booking IDs<").replace("#{booking_id}", "{booking_ids}")
+    + _HTML_GROUP_PASSENGERS
+    + _HTML_GROUP_PAYMENT
+    + _HTML_CLOSE
+)
+
+
+def render_group_receipt_text(group):
+    """Plain-text receipt of a whole group booking."""
+    passengers = "\n".join(group.passenger_lines(GROUP_PASSENGER_TEXT))
+    return GROUP_RECEIPT_TEXT.render(dict(group.text_fields, passengers=passengers))
+
+
+def render_group_confirmation(group):
+    """Return (subject, html_body, text_body) of the one confirmation email for a group booking."""
+    subject = GROUP_EMAIL_SUBJECT.render(group.text_fields)
+    text = EMAIL_TEXT.render({
+        "passenger_name": group.text_fields["passenger_name"],
+        "receipt": render_group_receipt_text(group),
+    })
+    passengers = "".join(group.passenger_lines(_HTML_GROUP_PASSENGER_ROW, html_values=True))
+    return subject, GROUP_EMAIL_HTML.render(dict(group.html_fields, passengers=passengers)), text
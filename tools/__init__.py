@@ -1,17 +1,17 @@
 from tools.search_tickets import search_tickets
 from tools.filter_by_budget import filter_by_budget
-from tools.collect_passenger import collect_passenger_details
-from tools.process_payment import process_payment_mock
-from tools.save_booking import save_booking_to_db
+from tools.hold_ticket import hold_ticket
+from tools.collect_passenger import collect_group_details, collect_passenger_details
+from tools.checkout import checkout, group_checkout
 from tools.generate_receipt import generate_receipt
-from tools.send_email import send_email_confirmation
 
 all_tools = [
     search_tickets,
     filter_by_budget,
+    hold_ticket,
     collect_passenger_details,
-    process_payment_mock,
-    save_booking_to_db,
+    collect_group_details,
+    checkout,
+    group_checkout,
     generate_receipt,
-    send_email_confirmation,
 ]
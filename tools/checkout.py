@@ -0,0 +1,159 @@
+import json
+from langchain_core.tools import tool
+from config import SMTP_EMAIL
+from catalog.store import SoldOutError, get_catalog
+from database.db import create_booking, create_group_booking
+from notifications.receipts import (
+    GroupReceipt, Receipt, render_confirmation, render_group_confirmation,
+    render_group_receipt_text, render_receipt_text,
+)
+from tools.collect_passenger import validate_group, validate_passenger
+from tools.process_payment import charge_payment, void_payment
+
+
+def _send_confirmation(email, render, receipt):
+    """Queue the confirmation email if SMTP is configured; returns a status line."""
+    if not SMTP_EMAIL:
+        return "SMTP credentials not configured. Email not sent."
+    try:
+        # smtplib and the MIME classes load on the first confirmation, not at startup
+        from notifications.outbox import queue_email
+
+        queue_email(email, *render(receipt))
+        return f"Confirmation email to {email} queued for delivery"
+    except Exception as e:
+        return f"Booking saved, but the email could not be queued: {e}"
+
+
+def _booking_failed(payment, error):
+    """Void the charge of a booking that did not commit; returns the failed result dict."""
+    void = void_payment(payment["transaction_id"], payment["amount_charged"])
+    # Sold out and bad input explain themselves; anything else is a storage fault
+    reason = str(error) if isinstance(error, (SoldOutError, ValueError)) else "The booking could not be saved."
+    return {
+        "status": "failed",
+        "transaction_id": payment["transaction_id"],
+        "payment": void["status"],
+        "message": f"{reason} {void['message']}; no charge was made.",
+    }
+
+
+def run_checkout(ticket_id, name, age, email, phone, hold_id=""):
+    """Pay for, book, and confirm one ticket; returns the result dict.
+
+    Ticket details and price come from the catalog, not from the caller.
+    The booking, payment record and seat decrement commit together; if the
+    booking fails after the mock charge for any reason, the charge is voided.
+    """
+    errors = validate_passenger(name, age, email, phone)
+    if errors:
+        return {"status": "invalid", "errors": errors}
+    name, email, phone = name.strip(), email.strip(), phone.strip()
+
+    catalog = get_catalog()
+    found = catalog.get_ticket(ticket_id)
+    if found is None:
+        return {"status": "error", "message": f"No ticket found with ID '{ticket_id}'."}
+    type_key, ticket = found
+
+    payment = charge_payment(ticket["price"], name)
+    if payment["status"] != "success":
+        return {"status": "payment_failed", "message": payment["error"]}
+
+    try:
+        row = create_booking(
+            name, email, phone, age, type_key.rstrip("s"), ticket["id"], ticket.get("origin"),
+            ticket.get("destination"), ticket.get("date"), ticket["price"], payment["transaction_id"],
+            catalog=catalog, hold_id=hold_id,
+        )
+    except Exception as e:
+        return _booking_failed(payment, e)
+
+    receipt = Receipt(row)
+    email_status = _send_confirmation(email, render_confirmation, receipt)
+
+    return {
+        "status": "confirmed",
+        "booking_id": row["booking_id"],
+        "transaction_id": payment["transaction_id"],
+        "email": email_status,
+        "receipt": render_receipt_text(receipt),
+    }
+
+
+def run_group_checkout(ticket_id, passengers, hold_id=""):
+    """Pay for and book one seat per passenger on a ticket, with one receipt and email.
+
+    Validates the whole group first, charges the total once, and books every
+    seat in one transaction; the confirmation goes to the first passenger.
+    """
+    group, errors = validate_group(passengers)
+    if errors:
+        return {"status": "invalid", "errors": errors}
+
+    catalog = get_catalog()
+    found = catalog.get_ticket(ticket_id)
+    if found is None:
+        return {"status": "error", "message": f"No ticket found with ID '{ticket_id}'."}
+    type_key, ticket = found
+
+    lead = group[0]
+    payment = charge_payment(ticket["price"] * len(group), lead["name"])
+    if payment["status"] != "success":
+        return {"status": "payment_failed", "message": payment["error"]}
+
+    try:
+        rows = create_group_booking(
+            [(p["name"], p["email"], p["phone"], p["age"]) for p in group],
+            type_key.rstrip("s"), ticket["id"], ticket.get("origin"), ticket.get("destination"),
+            ticket.get("date"), ticket["price"], payment["transaction_id"],
+            catalog=catalog, hold_id=hold_id,
+        )
+    except Exception as e:
+        return _booking_failed(payment, e)
+
+    receipt = GroupReceipt(rows)
+    email_status = _send_confirmation(lead["email"], render_group_confirmation, receipt)
+
+    return {
+        "status": "confirmed",
+        "booking_ids": [row["booking_id"] for row in rows],
+        "transaction_id": payment["transaction_id"],
+        "total": payment["amount_charged"],
+        "email": email_status,
+        "receipt": render_group_receipt_text(receipt),
+    }
+
+
+@tool
+def checkout(
+    ticket_id: str,
+    passenger_name: str,
+    passenger_age: int,
+    passenger_email: str,
+    passenger_phone: str,
+    hold_id: str = "",
+) -> str:
+    """Complete a booking in one step: take payment, save the booking, build the receipt and email it.
+    Call this ONLY after the user confirms payment. Pass the validated passenger details
+    and the hold_id from hold_ticket. Returns the booking ID and the receipt to show the user."""
+
+    try:
+        result = run_checkout(ticket_id, passenger_name, passenger_age, passenger_email, passenger_phone, hold_id)
+    except Exception as e:
+        result = {"status": "error", "message": str(e)}
+    return json.dumps(result)
+
+
+@tool
+def group_checkout(ticket_id: str, passengers: list[dict], hold_id: str = "") -> str:
+    """Book one ticket for several passengers at once: one payment for the total, all bookings
+    saved together, one combined receipt and email. Call this ONLY after the user confirms payment.
+    Pass the validated passengers from collect_group_details and the hold_id from hold_ticket
+    (held with seats = number of passengers). Returns the booking IDs and the receipt to show the user."""
+
+    try:
+        result = run_group_checkout(ticket_id, passengers, hold_id)
+    except Exception as e:
+        result = {"status": "error", "message": str(e)}
+    return json.dumps(result)
@@ -1,12 +1,10 @@
 import json
 from langchain_core.tools import tool
+from config import GROUP_BOOKING_MAX
 
 
-@tool
-def collect_passenger_details(name: str, age: int, email: str, phone: str) -> str:
-    """Validate and collect passenger details for booking.
-    All fields are required. Returns validation result."""
-
+def validate_passenger(name, age, email, phone):
+    """Return a list of validation errors for the passenger details (empty if valid)."""
     errors = []
 
     if not name or len(name.strip()) < 2:
@@ -15,9 +13,50 @@ def collect_passenger_details(name: str, age: int, email: str, phone: str) -> st
         errors.append("Age must be between 1 and 120")
     if "@" not in email or "." not in email:
         errors.append("Invalid email address")
+    elif not email.isascii():
+        # The outbox sends without SMTPUTF8, which can't address non-ASCII mailboxes
+        errors.append("Email address must use only ASCII characters")
     if len(phone.replace(" ", "").replace("-", "").replace("+", "")) < 10:
         errors.append("Phone number must be at least 10 digits")
 
+    return errors
+
+
+def validate_group(passengers):
+    """Validate a group's passenger dicts (name, age, email, phone) together.
+
+    Passengers after the first may leave out email and phone to use the
+    first passenger's. Returns (passengers with contact details filled in
+    and stripped, errors prefixed with the passenger number).
+    """
+    if not passengers:
+        return [], ["At least one passenger is required"]
+    if len(passengers) > GROUP_BOOKING_MAX:
+        return [], [f"A group booking can have at most {GROUP_BOOKING_MAX} passengers"]
+
+    lead = passengers[0]
+    group, errors = [], []
+    for n, p in enumerate(passengers, 1):
+        name = str(p.get("name") or "")
+        email = str(p.get("email") or lead.get("email") or "")
+        phone = str(p.get("phone") or lead.get("phone") or "")
+        try:
+            age = int(p.get("age"))
+        except (TypeError, ValueError):
+            errors.append(f"Passenger {n}: Age must be a number")
+            continue
+        errors.extend(f"Passenger {n}: {e}" for e in validate_passenger(name, age, email, phone))
+        group.append({"name": name.strip(), "age": age, "email": email.strip(), "phone": phone.strip()})
+    return group, errors
+
+
+@tool
+def collect_passenger_details(name: str, age: int, email: str, phone: str) -> str:
+    """Validate and collect passenger details for booking.
+    All fields are required. Returns validation result."""
+
+    errors = validate_passenger(name, age, email, phone)
+
     if errors:
         return json.dumps({"status": "invalid", "errors": errors})
 
@@ -30,3 +69,17 @@ def collect_passenger_details(name: str, age: int, email: str, phone: str) -> st
             "phone": phone.strip(),
         },
     })
+
+
+@tool
+def collect_group_details(passengers: list[dict]) -> str:
+    """Validate the details of several passengers travelling together on one ticket.
+    Each passenger is {"name", "age", "email", "phone"}; passengers after the first
+    may omit email and phone to use the first passenger's. Returns validation result."""
+
+    group, errors = validate_group(passengers)
+
+    if errors:
+        return json.dumps({"status": "invalid", "errors": errors})
+
+    return json.dumps({"status": "valid", "passengers": group})
@@ -1,33 +1,31 @@
-import json
 from langchain_core.tools import tool
-from config import TICKETS_PATH
+from tools.search_tickets import run_ticket_search
 
 
 @tool
-def filter_by_budget(ticket_type: str, max_budget: float, origin: str = "", destination: str = "", date: str = "") -> str:
+def filter_by_budget(
+    ticket_type: str,
+    max_budget: float,
+    origin: str = "",
+    destination: str = "",
+    date: str = "",
+    end_date: str = "",
+    depart_after: str = "",
+    depart_before: str = "",
+    travel_class: str = "",
+    genre: str = "",
+    min_seats: int = 1,
+    sort_by: str = "price",
+    page: int = 1,
+) -> str:
     """Filter available tickets by maximum budget.
-    Returns only tickets with price <= max_budget.
-    ticket_type: flight, train, or movie. max_budget: maximum price in INR (Indian Rupees)."""
-
-    with open(TICKETS_PATH, "r") as f:
-        data = json.load(f)
-
-    type_key = ticket_type.lower().rstrip("s") + "s"
-    if type_key not in data:
-        return f"Unknown ticket type '{ticket_type}'. Choose from: flight, train, movie."
-
-    results = data[type_key]
-
-    if origin:
-        results = [t for t in results if origin.lower() in t.get("origin", "").lower()]
-    if destination:
-        results = [t for t in results if destination.lower() in t.get("destination", "").lower()]
-    if date:
-        results = [t for t in results if t.get("date", "") == date]
-
-    results = [t for t in results if t.get("price", 0) <= max_budget]
-
-    if not results:
-        return f"No tickets found within budget of \u20b9{max_budget:.2f}. Try increasing your budget."
-
-    return json.dumps(results, indent=2)
+    Returns only tickets with price <= max_budget, as a table (header row of column names, then one row per ticket).
+    ticket_type: flight, train, or movie. max_budget: maximum price in INR (Indian Rupees).
+    Other filters work as in search_tickets (date phrases and ranges, departure window, class/genre, min_seats).
+    sort_by: price (cheapest first), relevance, departure or duration. page: result page, starting at 1."""
+
+    return run_ticket_search(
+        ticket_type, origin, destination, date, end_date, depart_after, depart_before,
+        travel_class, genre, min_seats, sort_by, page, max_price=max_budget,
+        empty_message=f"No tickets found within budget of ₹{max_budget:.2f}. Try increasing your budget.",
+    )
@@ -1,44 +1,15 @@
 from langchain_core.tools import tool
-from database.db import get_receipt_data
+from notifications.receipts import load_receipt, render_receipt_text
 
 
 @tool
 def generate_receipt(booking_id: int) -> str:
     """Generate a formatted receipt for a completed booking.
-    Use the booking_id returned from save_booking_to_db."""
+    Use the booking_id returned from checkout."""
 
-    data = get_receipt_data(booking_id)
+    receipt = load_receipt(booking_id)
 
-    if not data:
+    if not receipt:
         return f"No booking found with ID #{booking_id}"
 
-    receipt = f"""
-========================================
-     OMNIBOOK AI - BOOKING RECEIPT
-========================================
-Booking ID    : #{data['booking_id']}
-Date Booked   : {data['created_at']}
-Status        : {data['status'].upper()}
-----------------------------------------
-PASSENGER DETAILS
-  Name        : {data['passenger_name']}
-  Email       : {data['email']}
-  Phone       : {data['phone']}
-  Age         : {data['age']}
-----------------------------------------
-TICKET DETAILS
-  Type        : {data['ticket_type'].upper()}
-  Ticket ID   : {data['ticket_id']}
-  From        : {data['origin']}
-  To          : {data['destination']}
-  Date        : {data['date']}
-----------------------------------------
-PAYMENT DETAILS
-  Amount      : \u20b9{data['price']:.2f}
-  Transaction : {data['transaction_id']}
-  Pay Status  : {data['payment_status'].upper()}
-========================================
- Thank you for booking with OmniBook AI!
-========================================"""
-
-    return receipt.strip()
+    return render_receipt_text(receipt)
@@ -0,0 +1,39 @@
+import json
+import time
+from typing import Annotated
+from langchain_core.tools import tool
+from pydantic import Field
+from catalog.store import SoldOutError, get_catalog
+
+
+@tool
+def hold_ticket(
+    ticket_type: str, ticket_id: str, seats: Annotated[int, Field(ge=1)] = 1, previous_hold_id: str = "",
+) -> str:
+    """Reserve seats on the ticket the user picked while they finish checking out.
+    Call this as soon as the user selects a ticket. The hold expires after a few minutes.
+    previous_hold_id: hold to cancel when the user switches to a different ticket.
+    Returns the hold_id to pass to checkout."""
+
+    catalog = get_catalog()
+    try:
+        if previous_hold_id:
+            catalog.release_hold(previous_hold_id)
+        hold = catalog.hold_seats(ticket_type, ticket_id, seats)
+    except SoldOutError as e:
+        return json.dumps({"status": "sold_out", "message": str(e)})
+    except ValueError as e:
+        return json.dumps({"status": "error", "message": str(e)})
+
+    if not hold["hold_id"]:
+        return json.dumps({
+            "status": "not_held",
+            "message": "Seat holds are not available with this catalog; the seat is confirmed at booking time.",
+        })
+    return json.dumps({
+        "status": "held",
+        "hold_id": hold["hold_id"],
+        "ticket_id": ticket_id,
+        "seats": seats,
+        "expires_in_seconds": int(hold["expires_at"] - time.time()),
+    })
@@ -1,22 +1,27 @@
-import json
 import uuid
-from langchain_core.tools import tool
 
 
-@tool
-def process_payment_mock(amount: float, passenger_name: str, passenger_email: str) -> str:
-    """Process a mock payment for ticket booking.
-    Returns a transaction ID on success. No real charges are made."""
-
+def charge_payment(amount, passenger_name):
+    """Run the mock payment and return its result dict (status success or failed)."""
     if amount <= 0:
-        return json.dumps({"status": "failed", "error": "Amount must be greater than zero"})
+        return {"status": "failed", "error": "Amount must be greater than zero"}
 
     transaction_id = f"TXN-{uuid.uuid4().hex[:8].upper()}"
 
-    return json.dumps({
+    return {
         "status": "success",
         "transaction_id": transaction_id,
         "amount_charged": amount,
         "passenger_name": passenger_name,
         "message": f"Payment of \u20b9{amount:.2f} processed successfully for {passenger_name}",
-    })
+    }
+
+
+def void_payment(transaction_id, amount):
+    """Void a mock charge that was not turned into a booking; returns its result dict."""
+    return {
+        "status": "voided",
+        "transaction_id": transaction_id,
+        "amount_voided": amount,
+        "message": f"Payment {transaction_id} of \u20b9{amount:.2f} was voided",
+    }
@@ -0,0 +1,30 @@
+from config import RESULT_LIMIT
+
+
+def format_tickets(results, limit=RESULT_LIMIT, total=None, offset=0):
+    """Encode ticket dicts as a compact pipe-separated table.
+
+    The first line names the columns, then one row per ticket, capped at
+    `limit`. `total` and `offset` describe where this page sits in the full
+    result set, for the "more results" hint.
+    """
+    shown = results[:limit] if limit and limit > 0 else results
+    total = len(results) if total is None else total
+
+    columns = []
+    for t in shown:
+        for key in t:
+            if key not in columns:
+                columns.append(key)
+
+    lines = ["|".join(columns)]
+    for t in shown:
+        lines.append("|".join(str(t.get(c, "")) for c in columns))
+
+    if offset + len(shown) < total:
+        next_page = offset // limit + 2 if limit and limit > 0 else 2
+        lines.append(
+            f"(showing {offset + 1}-{offset + len(shown)} of {total}; "
+            f"request page {next_page} or narrow the search for more)"
+        )
+    return "\n".join(lines)
@@ -1,58 +1,93 @@
-import json
-import re
 from langchain_core.tools import tool
-from config import TICKETS_PATH
+from config import RESULT_LIMIT
+from catalog.dates import parse_date_range, parse_time_window
+from catalog.store import SORT_KEYS, get_catalog, resolve_route
+from tools.result_format import format_tickets
 
 
-def _load_tickets():
-    """Load ticket data from JSON file."""
-    with open(TICKETS_PATH, "r") as f:
-        return json.load(f)
+def run_ticket_search(
+    ticket_type, origin="", destination="", date="", end_date="", depart_after="", depart_before="",
+    travel_class="", genre="", min_seats=1, sort_by="relevance", page=1, max_price=None,
+    empty_message="No tickets found matching your criteria. Try broadening your search.",
+):
+    """Shared implementation of search_tickets and filter_by_budget; returns the tool output."""
+    catalog = get_catalog()
 
+    type_key = ticket_type.lower().rstrip("s") + "s"
+    if not catalog.has_type(type_key):
+        return f"Unknown ticket type '{ticket_type}'. Choose from: flight, train, movie."
+    if sort_by not in SORT_KEYS:
+        return f"Unknown sort_by '{sort_by}'. Choose from: {', '.join(SORT_KEYS)}."
 
-def _is_valid_date(s):
-    """Check if string matches YYYY-MM-DD format."""
-    return bool(re.match(r'^\d{4}-\d{2}-\d{2}$', s))
+    window = parse_time_window(depart_after, depart_before)
+    if window is None:
+        return f"Invalid departure window '{depart_after}'-'{depart_before}'. Use HH:MM or morning/afternoon/evening/night."
 
+    origin, destination, city_note = resolve_route(catalog, origin, destination)
+    notes = [city_note]
 
-@tool
-def search_tickets(ticket_type: str, origin: str = "", destination: str = "", date: str = "") -> str:
-    """Search for available tickets by type (flight, train, or movie).
-    For movies, 'origin' is the city name.
-    IMPORTANT: 'date' must be in YYYY-MM-DD format ONLY. Do NOT pass budget/price numbers here.
-    If the user mentions a price/budget number, use filter_by_budget tool instead."""
+    date_range = parse_date_range(date, end_date)
+    budget_from_date = None
+    if date_range is None:
+        date_range = ("", "")
+        # If a number was passed as date, it's likely a budget — hint the agent
+        try:
+            budget_from_date = float(date)
+        except ValueError:
+            notes.append(f"(Note: '{date}' is not a recognised date, so no date filter was applied.)")
 
-    data = _load_tickets()
+    page = max(int(page or 1), 1)
+    offset = (page - 1) * RESULT_LIMIT
+    filters = dict(
+        date_from=date_range[0], date_to=date_range[1],
+        depart_after=window[0], depart_before=window[1],
+        travel_class=travel_class, genre=genre, min_seats=min_seats,
+        max_price=max_price, sort_by=sort_by,
+    )
 
-    type_key = ticket_type.lower().rstrip("s") + "s"
-    if type_key not in data:
-        return f"Unknown ticket type '{ticket_type}'. Choose from: flight, train, movie."
-
-    results = data[type_key]
-
-    if origin:
-        results = [t for t in results if origin.lower() in t.get("origin", "").lower()]
-    if destination:
-        results = [t for t in results if destination.lower() in t.get("destination", "").lower()]
-
-    # Only filter by date if it's a valid YYYY-MM-DD format, otherwise ignore it
-    if date:
-        if _is_valid_date(date):
-            results = [t for t in results if t.get("date", "") == date]
-        else:
-            # If a number was passed as date, it's likely a budget — hint the agent
-            try:
-                budget = float(date)
-                filtered = [t for t in results if t.get("price", 0) <= budget]
-                if filtered:
-                    results = filtered
-                    return json.dumps(results, indent=2) + f"\n\n(Note: Showing results within budget of {budget}. The value '{date}' was treated as a budget, not a date.)"
-            except ValueError:
-                pass  # Not a number either, just ignore the date filter
+    results, total = catalog.query(type_key, origin, destination, offset, RESULT_LIMIT, **filters)
+    if budget_from_date is not None:
+        budget_filters = dict(filters, max_price=budget_from_date if max_price is None else min(max_price, budget_from_date))
+        within, within_total = catalog.query(type_key, origin, destination, offset, RESULT_LIMIT, **budget_filters)
+        if within_total:
+            results, total = within, within_total
+            notes.append(f"(Note: Showing results within budget of {budget_from_date}. The value '{date}' was treated as a budget, not a date.)")
 
+    if not total:
+        return " ".join(filter(None, [empty_message] + notes))
     if not results:
-        return "No tickets found matching your criteria. Try broadening your search."
+        return f"No more results: only {total} tickets match, so page {page} is empty."
+
+    return "\n".join(filter(None, [format_tickets(results, total=total, offset=offset)] + notes))
 
-    return json.dumps(results, indent=2)
 
-    return json.dumps(results, indent=2)
+@tool
+def search_tickets(
+    ticket_type: str,
+    origin: str = "",
+    destination: str = "",
+    date: str = "",
+    end_date: str = "",
+    depart_after: str = "",
+    depart_before: str = "",
+    travel_class: str = "",
+    genre: str = "",
+    min_seats: int = 1,
+    sort_by: str = "relevance",
+    page: int = 1,
+) -> str:
+    """Search for available tickets by type (flight, train, or movie).
+    Returns a table: a header row of column names, then one row per ticket.
+    For movies, 'origin' is the city name.
+    date: YYYY-MM-DD, or one of: today, tomorrow, this weekend, next weekend, this week, next week.
+    end_date (YYYY-MM-DD) turns date into an inclusive range.
+    depart_after/depart_before: HH:MM, or depart_after = morning, afternoon, evening or night.
+    travel_class (e.g. Economy, Sleeper) or genre (movies) filter by category; min_seats = seats needed.
+    sort_by: relevance, price, departure or duration. page: result page, starting at 1.
+    IMPORTANT: Do NOT pass budget/price numbers as date.
+    If the user mentions a price/budget number, use filter_by_budget tool instead."""
+
+    return run_ticket_search(
+        ticket_type, origin, destination, date, end_date, depart_after, depart_before,
+        travel_class, genre, min_seats, sort_by, page,
+    )